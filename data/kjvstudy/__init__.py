@@ -1,35 +1,126 @@
-"""Biblical resource data - maps, angels, prophets, names of God, etc."""
+"""Biblical resource data - maps, angels, prophets, names of God, etc.
 
+By default every category in ``resources/*.json`` is loaded and indexed at
+import time. Set ``KJVSTUDY_LAZY_RESOURCES=1`` to defer that work: the
+``*_DATA`` names are then resolved through a module ``__getattr__`` (PEP 562)
+that loads and indexes only the requested category on first access.
+
+Either way, categories come from ``resources.snapshot`` (built by
+``scripts/build-resource-snapshot.py``) when its source hash matches the
+current JSON files, skipping JSON parsing and slug index construction. Set
+``KJVSTUDY_RESOURCE_SNAPSHOT=0`` to always read the JSON.
+
+For multi-worker deployments, ``KJVSTUDY_RESOURCE_STORE=/path/to/resources.store``
+serves every category as a read-only view over a memory-mapped store (see
+``shared_store.py``) so workers share one physical copy of the corpus.
+"""
+
+import hashlib
 import json
+import os
+import pickle
 import re
 from pathlib import Path
 
+_BASE_DIR = Path(__file__).parent
+_RESOURCES_DIR = _BASE_DIR / "resources"
+_LEGACY_PATH = _BASE_DIR / "resources.json"
+_SNAPSHOT_PATH = _BASE_DIR / "resources.snapshot"
+
+# Bump when the snapshot layout or slug rules change
+_SNAPSHOT_VERSION = 1
+
+_LAZY = os.environ.get("KJVSTUDY_LAZY_RESOURCES", "").lower() in ("1", "true", "yes")
+_USE_SNAPSHOT = os.environ.get("KJVSTUDY_RESOURCE_SNAPSHOT", "1").lower() not in ("0", "false", "no")
+_STORE_PATH = os.environ.get("KJVSTUDY_RESOURCE_STORE", "")
+
+# Exported name -> resource category key (also the resources/<key>.json file name)
+_DATA_ATTRS = {
+    "BIBLICAL_LOCATIONS": "biblical_locations",
+    "ANGELS_DATA": "angels",
+    "PROPHETS_DATA": "prophets",
+    "NAMES_DATA": "names",
+    "PARABLES_DATA": "parables",
+    "COVENANTS_DATA": "covenants",
+    "APOSTLES_DATA": "apostles",
+    "WOMEN_DATA": "women",
+    "FESTIVALS_DATA": "festivals",
+    "FRUITS_DATA": "fruits",
+    "MIRACLES_DATA": "miracles",
+    "PRAYERS_DATA": "prayers",
+    "BEATITUDES_DATA": "beatitudes",
+    "TEN_COMMANDMENTS_DATA": "ten_commandments",
+    "ARMOR_OF_GOD_DATA": "armor_of_god",
+    "I_AM_STATEMENTS_DATA": "i_am_statements",
+    # Theological Resources
+    "TRINITY_DATA": "trinity",
+    "CHRISTOLOGY_DATA": "christology",
+    "SOTERIOLOGY_DATA": "soteriology",
+    "PNEUMATOLOGY_DATA": "pneumatology",
+    "ESCHATOLOGY_DATA": "eschatology",
+    "ECCLESIOLOGY_DATA": "ecclesiology",
+    "TYPES_AND_SHADOWS_DATA": "types_and_shadows",
+    "MESSIANIC_PROPHECIES_DATA": "messianic_prophecies",
+    "BLOOD_IN_SCRIPTURE_DATA": "blood_in_scripture",
+    "KINGDOM_OF_GOD_DATA": "kingdom_of_god",
+    "NAMES_OF_CHRIST_DATA": "names_of_christ",
+    "SPIRITS_AND_DEMONS_DATA": "spirits_and_demons",
+    "PERSONIFICATIONS_DATA": "personifications",
+    # Additional Systematic Theology Resources
+    "BIBLIOLOGY_DATA": "bibliology",
+    "THEOLOGY_PROPER_DATA": "theology_proper",
+    "ANTHROPOLOGY_DATA": "anthropology",
+    "HAMARTIOLOGY_DATA": "hamartiology",
+    "PROVIDENCE_DATA": "providence",
+    "GRACE_DATA": "grace",
+    "JUSTIFICATION_DATA": "justification",
+    "SANCTIFICATION_DATA": "sanctification",
+    "LAW_AND_GOSPEL_DATA": "law_and_gospel",
+    "WORSHIP_DATA": "worship",
+}
+
+# Categories that get a slug index (everything except the map locations)
+_INDEXED_CATEGORIES = [key for key in _DATA_ATTRS.values() if key != "biblical_locations"]
+
 
 def _load_resources() -> dict:
     """Load resources from per-category JSON files, fallback to legacy single file."""
-    base_dir = Path(__file__).parent
-    resources_dir = base_dir / "resources"
-    legacy_path = base_dir / "resources.json"
-
     aggregated = {}
 
-    if resources_dir.exists():
-        for path in sorted(resources_dir.glob("*.json")):
+    if _RESOURCES_DIR.exists():
+        for path in sorted(_RESOURCES_DIR.glob("*.json")):
             with open(path, "r", encoding="utf-8") as f:
                 content = json.load(f)
                 if isinstance(content, dict):
                     aggregated.update(content)
 
-    elif legacy_path.exists():
-        with open(legacy_path, "r", encoding="utf-8") as f:
+    elif _LEGACY_PATH.exists():
+        with open(_LEGACY_PATH, "r", encoding="utf-8") as f:
             aggregated = json.load(f)
 
     return aggregated
 
 
-_data = _load_resources()
-if not _data:
-    raise FileNotFoundError("Resource data not found. Ensure data/resources/*.json exists.")
+_legacy_data = None
+
+
+def _load_category(key: str) -> dict:
+    """Load a single category from resources/<key>.json, fallback to a full load."""
+    global _legacy_data
+
+    path = _RESOURCES_DIR / f"{key}.json"
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+        if isinstance(content, dict) and key in content:
+            return content[key]
+
+    if _legacy_data is None:
+        _legacy_data = _load_resources()
+    aggregated = _legacy_data
+    if key not in aggregated:
+        raise FileNotFoundError(f"Resource category '{key}' not found. Ensure data/resources/{key}.json exists.")
+    return aggregated[key]
 
 
 def _create_slug(text: str) -> str:
@@ -39,10 +130,6 @@ def _create_slug(text: str) -> str:
     return slug.strip('-')
 
 
-# Build slug index for O(1) lookups
-_RESOURCE_SLUG_INDEX = {}
-
-
 def _build_slug_index(data: dict):
     """Build a slug index for fast resource lookups."""
     index = {}
@@ -54,138 +141,174 @@ def _build_slug_index(data: dict):
                 index[slug] = (item_data, item_name, category_name, data)
     return index
 
-BIBLICAL_LOCATIONS = _data["biblical_locations"]
-ANGELS_DATA = _data["angels"]
-PROPHETS_DATA = _data["prophets"]
-NAMES_DATA = _data["names"]
-PARABLES_DATA = _data["parables"]
-COVENANTS_DATA = _data["covenants"]
-APOSTLES_DATA = _data["apostles"]
-WOMEN_DATA = _data["women"]
-FESTIVALS_DATA = _data["festivals"]
-FRUITS_DATA = _data["fruits"]
-MIRACLES_DATA = _data["miracles"]
-PRAYERS_DATA = _data["prayers"]
-BEATITUDES_DATA = _data["beatitudes"]
-TEN_COMMANDMENTS_DATA = _data["ten_commandments"]
-ARMOR_OF_GOD_DATA = _data["armor_of_god"]
-I_AM_STATEMENTS_DATA = _data["i_am_statements"]
-
-# Theological Resources
-TRINITY_DATA = _data["trinity"]
-CHRISTOLOGY_DATA = _data["christology"]
-SOTERIOLOGY_DATA = _data["soteriology"]
-PNEUMATOLOGY_DATA = _data["pneumatology"]
-ESCHATOLOGY_DATA = _data["eschatology"]
-ECCLESIOLOGY_DATA = _data["ecclesiology"]
-TYPES_AND_SHADOWS_DATA = _data["types_and_shadows"]
-MESSIANIC_PROPHECIES_DATA = _data["messianic_prophecies"]
-BLOOD_IN_SCRIPTURE_DATA = _data["blood_in_scripture"]
-KINGDOM_OF_GOD_DATA = _data["kingdom_of_god"]
-NAMES_OF_CHRIST_DATA = _data["names_of_christ"]
-SPIRITS_AND_DEMONS_DATA = _data["spirits_and_demons"]
-PERSONIFICATIONS_DATA = _data["personifications"]
-
-# Additional Systematic Theology Resources
-BIBLIOLOGY_DATA = _data["bibliology"]
-THEOLOGY_PROPER_DATA = _data["theology_proper"]
-ANTHROPOLOGY_DATA = _data["anthropology"]
-HAMARTIOLOGY_DATA = _data["hamartiology"]
-PROVIDENCE_DATA = _data["providence"]
-GRACE_DATA = _data["grace"]
-JUSTIFICATION_DATA = _data["justification"]
-SANCTIFICATION_DATA = _data["sanctification"]
-LAW_AND_GOSPEL_DATA = _data["law_and_gospel"]
-WORSHIP_DATA = _data["worship"]
-
-# Build slug indexes for all resource dictionaries
-_SLUG_INDEXES = {
-    'angels': _build_slug_index(ANGELS_DATA),
-    'prophets': _build_slug_index(PROPHETS_DATA),
-    'names': _build_slug_index(NAMES_DATA),
-    'parables': _build_slug_index(PARABLES_DATA),
-    'covenants': _build_slug_index(COVENANTS_DATA),
-    'apostles': _build_slug_index(APOSTLES_DATA),
-    'women': _build_slug_index(WOMEN_DATA),
-    'festivals': _build_slug_index(FESTIVALS_DATA),
-    'fruits': _build_slug_index(FRUITS_DATA),
-    'miracles': _build_slug_index(MIRACLES_DATA),
-    'prayers': _build_slug_index(PRAYERS_DATA),
-    'beatitudes': _build_slug_index(BEATITUDES_DATA),
-    'ten_commandments': _build_slug_index(TEN_COMMANDMENTS_DATA),
-    'armor_of_god': _build_slug_index(ARMOR_OF_GOD_DATA),
-    'i_am_statements': _build_slug_index(I_AM_STATEMENTS_DATA),
-    'trinity': _build_slug_index(TRINITY_DATA),
-    'christology': _build_slug_index(CHRISTOLOGY_DATA),
-    'soteriology': _build_slug_index(SOTERIOLOGY_DATA),
-    'pneumatology': _build_slug_index(PNEUMATOLOGY_DATA),
-    'eschatology': _build_slug_index(ESCHATOLOGY_DATA),
-    'ecclesiology': _build_slug_index(ECCLESIOLOGY_DATA),
-    'types_and_shadows': _build_slug_index(TYPES_AND_SHADOWS_DATA),
-    'messianic_prophecies': _build_slug_index(MESSIANIC_PROPHECIES_DATA),
-    'blood_in_scripture': _build_slug_index(BLOOD_IN_SCRIPTURE_DATA),
-    'kingdom_of_god': _build_slug_index(KINGDOM_OF_GOD_DATA),
-    'names_of_christ': _build_slug_index(NAMES_OF_CHRIST_DATA),
-    'spirits_and_demons': _build_slug_index(SPIRITS_AND_DEMONS_DATA),
-    'personifications': _build_slug_index(PERSONIFICATIONS_DATA),
-    'bibliology': _build_slug_index(BIBLIOLOGY_DATA),
-    'theology_proper': _build_slug_index(THEOLOGY_PROPER_DATA),
-    'anthropology': _build_slug_index(ANTHROPOLOGY_DATA),
-    'hamartiology': _build_slug_index(HAMARTIOLOGY_DATA),
-    'providence': _build_slug_index(PROVIDENCE_DATA),
-    'grace': _build_slug_index(GRACE_DATA),
-    'justification': _build_slug_index(JUSTIFICATION_DATA),
-    'sanctification': _build_slug_index(SANCTIFICATION_DATA),
-    'law_and_gospel': _build_slug_index(LAW_AND_GOSPEL_DATA),
-    'worship': _build_slug_index(WORSHIP_DATA),
-}
+
+def _source_paths() -> list:
+    """Return the JSON files resources are loaded from."""
+    if _RESOURCES_DIR.exists():
+        return sorted(_RESOURCES_DIR.glob("*.json"))
+    return [_LEGACY_PATH] if _LEGACY_PATH.exists() else []
+
+
+def _source_hash() -> str:
+    """Hash the resource JSON sources that a snapshot was built from."""
+    digest = hashlib.sha256(f"v{_SNAPSHOT_VERSION}".encode())
+    for path in _source_paths():
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _source_stats() -> list:
+    """Cheap (name, size, mtime) fingerprint checked before hashing the sources."""
+    stats = []
+    for path in _source_paths():
+        st = path.stat()
+        stats.append((path.name, st.st_size, st.st_mtime_ns))
+    return stats
+
+
+_snapshot = None
+
+
+def _snapshot_categories() -> dict:
+    """Return {category: pickled (data, slug index)} from a fresh snapshot, else {}."""
+    global _snapshot
+
+    if _snapshot is None:
+        _snapshot = {}
+        if _USE_SNAPSHOT and _SNAPSHOT_PATH.exists():
+            try:
+                with open(_SNAPSHOT_PATH, "rb") as f:
+                    payload = pickle.load(f)
+            except Exception:
+                payload = None
+            if isinstance(payload, dict) and payload.get("version") == _SNAPSHOT_VERSION:
+                # Unchanged stats skip the hash; touched files fall back to comparing content
+                if (payload.get("source_stats") == _source_stats()
+                        or payload.get("source_hash") == _source_hash()):
+                    _snapshot = payload["categories"]
+    return _snapshot
+
+
+def _write_snapshot(path: Path = _SNAPSHOT_PATH) -> Path:
+    """Compile the JSON sources and their slug indexes into a snapshot file."""
+    aggregated = _load_resources()
+    if not aggregated:
+        raise FileNotFoundError("Resource data not found. Ensure data/resources/*.json exists.")
+
+    categories = {}
+    for key in _DATA_ATTRS.values():
+        data = aggregated[key]
+        index = _build_slug_index(data) if key in _INDEXED_CATEGORIES else None
+        # Pickled per category so lazy mode only unpickles what it touches
+        categories[key] = pickle.dumps((data, index), protocol=pickle.HIGHEST_PROTOCOL)
+
+    payload = {
+        "version": _SNAPSHOT_VERSION,
+        "source_hash": _source_hash(),
+        "source_stats": _source_stats(),
+        "categories": categories,
+    }
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _write_store(path: Path = _BASE_DIR / "resources.store") -> Path:
+    """Compile the JSON sources into a memory-mappable shared store."""
+    from .shared_store import write_store
+
+    aggregated = _load_resources()
+    if not aggregated:
+        raise FileNotFoundError("Resource data not found. Ensure data/resources/*.json exists.")
+    data = {key: aggregated[key] for key in _DATA_ATTRS.values()}
+    meta = {
+        "version": _SNAPSHOT_VERSION,
+        "source_hash": _source_hash(),
+        "source_stats": _source_stats(),
+    }
+    return write_store(path, data, _create_slug, meta)
+
+
+_store = None
+
+
+def _shared_store():
+    """Open the shared store named by KJVSTUDY_RESOURCE_STORE if it matches the sources."""
+    global _store
+
+    if _store is None:
+        _store = False
+        if _STORE_PATH and os.path.exists(_STORE_PATH):
+            from .shared_store import SharedResourceStore
+
+            store = SharedResourceStore(_STORE_PATH)
+            meta = store.meta
+            if meta.get("version") == _SNAPSHOT_VERSION and (
+                    [tuple(s) for s in meta.get("source_stats", [])] == _source_stats()
+                    or meta.get("source_hash") == _source_hash()):
+                _store = store
+    return _store or None
+
+
+# Loaded categories, their slug indexes, and id(data dict) -> category key
+_data = {}
+_SLUG_INDEXES = {}
+_CATEGORY_BY_ID = {}
+
+
+def _register(key: str, data: dict, index: dict = None) -> dict:
+    """Record a loaded category and build its slug index unless one is given."""
+    _data[key] = data
+    _CATEGORY_BY_ID[id(data)] = key
+    if key in _INDEXED_CATEGORIES:
+        _SLUG_INDEXES[key] = index if index is not None else _build_slug_index(data)
+    return data
+
+
+def _get_category(key: str) -> dict:
+    """Return a category's data, loading and indexing it on first use."""
+    data = _data.get(key)
+    if data is None:
+        store = _shared_store()
+        if store is not None and key in store:
+            index = store.slug_index(key) if key in _INDEXED_CATEGORIES else None
+            return _register(key, store.category(key), index)
+        blob = _snapshot_categories().get(key)
+        if blob is not None:
+            data = _register(key, *pickle.loads(blob))
+        else:
+            data = _register(key, _load_category(key))
+    return data
+
+
+if not _LAZY:
+    for _name, _key in _DATA_ATTRS.items():
+        globals()[_name] = _get_category(_key)
+    del _name, _key
+
+
+def __getattr__(name: str):
+    """Resolve ``*_DATA`` names on first access in lazy mode (PEP 562)."""
+    key = _DATA_ATTRS.get(name)
+    if key is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = _get_category(key)
+    # Cache on the module so later lookups bypass __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_DATA_ATTRS))
 
 
 def find_resource_by_slug(data: dict, slug: str):
     """Fast O(1) lookup for resource items by slug using pre-built indexes."""
     # Find which resource type this data dict corresponds to
-    data_to_key = {
-        id(ANGELS_DATA): 'angels',
-        id(PROPHETS_DATA): 'prophets',
-        id(NAMES_DATA): 'names',
-        id(PARABLES_DATA): 'parables',
-        id(COVENANTS_DATA): 'covenants',
-        id(APOSTLES_DATA): 'apostles',
-        id(WOMEN_DATA): 'women',
-        id(FESTIVALS_DATA): 'festivals',
-        id(FRUITS_DATA): 'fruits',
-        id(MIRACLES_DATA): 'miracles',
-        id(PRAYERS_DATA): 'prayers',
-        id(BEATITUDES_DATA): 'beatitudes',
-        id(TEN_COMMANDMENTS_DATA): 'ten_commandments',
-        id(ARMOR_OF_GOD_DATA): 'armor_of_god',
-        id(I_AM_STATEMENTS_DATA): 'i_am_statements',
-        id(TRINITY_DATA): 'trinity',
-        id(CHRISTOLOGY_DATA): 'christology',
-        id(SOTERIOLOGY_DATA): 'soteriology',
-        id(PNEUMATOLOGY_DATA): 'pneumatology',
-        id(ESCHATOLOGY_DATA): 'eschatology',
-        id(ECCLESIOLOGY_DATA): 'ecclesiology',
-        id(TYPES_AND_SHADOWS_DATA): 'types_and_shadows',
-        id(MESSIANIC_PROPHECIES_DATA): 'messianic_prophecies',
-        id(BLOOD_IN_SCRIPTURE_DATA): 'blood_in_scripture',
-        id(KINGDOM_OF_GOD_DATA): 'kingdom_of_god',
-        id(NAMES_OF_CHRIST_DATA): 'names_of_christ',
-        id(SPIRITS_AND_DEMONS_DATA): 'spirits_and_demons',
-        id(PERSONIFICATIONS_DATA): 'personifications',
-        id(BIBLIOLOGY_DATA): 'bibliology',
-        id(THEOLOGY_PROPER_DATA): 'theology_proper',
-        id(ANTHROPOLOGY_DATA): 'anthropology',
-        id(HAMARTIOLOGY_DATA): 'hamartiology',
-        id(PROVIDENCE_DATA): 'providence',
-        id(GRACE_DATA): 'grace',
-        id(JUSTIFICATION_DATA): 'justification',
-        id(SANCTIFICATION_DATA): 'sanctification',
-        id(LAW_AND_GOSPEL_DATA): 'law_and_gospel',
-        id(WORSHIP_DATA): 'worship',
-    }
-
-    data_key = data_to_key.get(id(data))
+    data_key = _CATEGORY_BY_ID.get(id(data))
     if data_key and data_key in _SLUG_INDEXES:
         result = _SLUG_INDEXES[data_key].get(slug)
         if result:
@@ -195,6 +318,58 @@ def find_resource_by_slug(data: dict, slug: str):
     return None, None, None
 
 
+# slug -> resource key whose slug index holds it, across every category
+_GLOBAL_SLUG_INDEX = None
+# slug -> resource keys that produce it, for slugs claimed by more than one category
+_SLUG_COLLISIONS = {}
+
+
+def _build_global_slug_index():
+    """Merge the per-category slug indexes; the first category in export order wins a shared slug."""
+    global _GLOBAL_SLUG_INDEX
+
+    index = {}
+    collisions = {}
+    for key in _INDEXED_CATEGORIES:
+        _get_category(key)
+        for slug in _SLUG_INDEXES[key]:
+            if slug in index:
+                collisions.setdefault(slug, [index[slug]]).append(key)
+                continue
+            index[slug] = key
+
+    _SLUG_COLLISIONS.clear()
+    _SLUG_COLLISIONS.update(collisions)
+    _GLOBAL_SLUG_INDEX = index
+    return index
+
+
+def resolve_slug(slug: str):
+    """O(1) lookup of a slug across all resource types.
+
+    Returns (resource_key, item_data, item_name, category_name), e.g.
+    ('angels', {...}, 'Michael the Archangel', 'Named Angels'). In lazy mode
+    the first call loads every indexed category.
+    """
+    index = _GLOBAL_SLUG_INDEX if _GLOBAL_SLUG_INDEX is not None else _build_global_slug_index()
+    key = index.get(slug)
+    if key:
+        item_data, item_name, category_name, _ = _SLUG_INDEXES[key][slug]
+        return key, item_data, item_name, category_name
+    return None, None, None, None
+
+
+def find_slug_collisions() -> dict:
+    """Return {slug: [resource keys]} for slugs produced by more than one category."""
+    if _GLOBAL_SLUG_INDEX is None:
+        _build_global_slug_index()
+    return {slug: list(keys) for slug, keys in _SLUG_COLLISIONS.items()}
+
+
+if not _LAZY:
+    _build_global_slug_index()
+
+
 __all__ = [
     'BIBLICAL_LOCATIONS',
     'ANGELS_DATA',
@@ -239,4 +414,6 @@ __all__ = [
     'WORSHIP_DATA',
     # Functions
     'find_resource_by_slug',
+    'resolve_slug',
+    'find_slug_collisions',
 ]
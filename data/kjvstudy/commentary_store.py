@@ -0,0 +1,209 @@
+"""Random-access commentary store: one verse's commentary per small read.
+
+``scripts/convert-sword-commentaries.py --store`` writes a ``<module>.cstore``
+file next to each commentary JSON. The file holds every entry's UTF-8 text
+back to back in canonical book/chapter/verse order, followed by a sorted index
+of packed verse ids and text offsets and a small JSON header (module name and
+the book slug order). Opening a store maps it read-only; a lookup is a binary
+search over the index plus one slice of the text region, and a chapter is one
+contiguous slice.
+
+    from data.kjvstudy.commentary_store import get_commentary, get_chapter
+
+    get_commentary("MHC", "genesis-1-1")
+    get_chapter("MHC", "genesis", 1)   # {verse: text}
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from .references import MAX_CHAPTER, MAX_VERSE, pack as pack_verse
+
+MAGIC = b"KJVCOMM1"
+# magic, entry count, header length, index offset (the text region starts right after)
+_PREAMBLE = struct.Struct("<8sIIQ")
+
+COMMENTARY_DIR = Path(__file__).resolve().parent.parent / "commentaries"
+
+
+def split_key(key: str):
+    """Split a ``book-chapter-verse`` key (``1-samuel-3-4``) into (slug, chapter, verse)."""
+    slug, chapter, verse = key.rsplit("-", 2)
+    return slug, int(chapter), int(verse)
+
+
+def _le_array(typecode: str, values=()) -> array:
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+class CommentaryStoreWriter:
+    """Write (key, text) entries, in canonical order, to a store file.
+
+    ``books`` lists every book slug in canonical order; it is stored in the
+    header so readers need no versification table of their own.
+    """
+
+    def __init__(self, path, module: str, books: list):
+        self.path = Path(path)
+        self._header = {"module": module, "books": list(books)}
+        self._book_numbers = {slug: num for num, slug in enumerate(books)}
+        self._ids = array("I")
+        self._offsets = array("Q", [0])
+        self._file = open(self.path, "wb")
+        self._file.write(_PREAMBLE.pack(MAGIC, 0, 0, 0))
+
+    def add(self, key: str, text: str):
+        slug, chapter, verse = split_key(key)
+        verse_id = pack_verse(self._book_numbers[slug], chapter, verse)
+        if self._ids and verse_id <= self._ids[-1]:
+            raise ValueError(f"{key} is out of canonical order")
+        raw = text.encode("utf-8")
+        self._file.write(raw)
+        self._ids.append(verse_id)
+        self._offsets.append(self._offsets[-1] + len(raw))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def close(self):
+        f = self._file
+        index_offset = f.tell()
+        # 8-byte alignment so readers can cast the index without copying
+        f.write(b"\0" * (-index_offset % 8))
+        index_offset = f.tell()
+        f.write(_le_array("Q", self._offsets).tobytes())
+        f.write(_le_array("I", self._ids).tobytes())
+        header = json.dumps(self._header, ensure_ascii=False).encode("utf-8")
+        f.write(header)
+        f.seek(0)
+        f.write(_PREAMBLE.pack(MAGIC, len(self._ids), len(header), index_offset))
+        f.close()
+        return len(self._ids)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+def write_commentary_store(path, entries, module: str, books: list) -> int:
+    """Write (key, text) pairs to a store file. Returns the number of entries."""
+    with CommentaryStoreWriter(path, module, books) as writer:
+        for key, text in entries:
+            writer.add(key, text)
+    return len(writer)
+
+
+class CommentaryStore:
+    """Memory-mapped reader over a store file written by ``CommentaryStoreWriter``."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, header_len, index_offset = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a commentary store")
+        offsets_end = index_offset + (count + 1) * 8
+        ids_end = offsets_end + count * 4
+        header = json.loads(self._mm[ids_end:ids_end + header_len])
+        self.module = header["module"]
+        self.books = header["books"]
+        self._book_numbers = {slug: num for num, slug in enumerate(self.books)}
+        self._base = _PREAMBLE.size
+        self._view = None
+        if sys.byteorder == "little":
+            self._view = view = memoryview(self._mm)
+            self._offsets = view[index_offset:offsets_end].cast("Q")
+            self._ids = view[offsets_end:ids_end].cast("I")
+        else:
+            self._offsets = _le_array("Q", self._mm[index_offset:offsets_end])
+            self._ids = _le_array("I", self._mm[offsets_end:ids_end])
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _text(self, start: int, stop: int) -> str:
+        return self._mm[self._base + self._offsets[start]:self._base + self._offsets[stop]].decode("utf-8")
+
+    def _find(self, verse_id: int):
+        pos = bisect_left(self._ids, verse_id)
+        if pos < len(self._ids) and self._ids[pos] == verse_id:
+            return pos
+        return None
+
+    def get(self, key: str):
+        """Return the commentary text for a ``book-chapter-verse`` key, or None."""
+        try:
+            slug, chapter, verse = split_key(key)
+        except ValueError:
+            return None
+        return self.get_verse(slug, chapter, verse)
+
+    def get_verse(self, book: str, chapter: int, verse: int):
+        """Return the commentary text for one verse, or None."""
+        book_num = self._book_numbers.get(book)
+        if book_num is None or not (1 <= chapter <= MAX_CHAPTER and 1 <= verse <= MAX_VERSE):
+            return None
+        pos = self._find(pack_verse(book_num, chapter, verse))
+        return None if pos is None else self._text(pos, pos + 1)
+
+    def get_chapter(self, book: str, chapter: int) -> dict:
+        """Return {verse: text} for every verse of a chapter that has commentary."""
+        book_num = self._book_numbers.get(book)
+        if book_num is None or not 1 <= chapter <= MAX_CHAPTER:
+            return {}
+        start = bisect_left(self._ids, pack_verse(book_num, chapter, 0))
+        stop = bisect_right(self._ids, pack_verse(book_num, chapter, MAX_VERSE), start)
+        if start == stop:
+            return {}
+        # One read for the whole chapter, then split at the entry offsets
+        base = self._offsets[start]
+        raw = self._mm[self._base + base:self._base + self._offsets[stop]]
+        return {self._ids[pos] & 0xFF: raw[self._offsets[pos] - base:self._offsets[pos + 1] - base].decode("utf-8")
+                for pos in range(start, stop)}
+
+    def keys(self):
+        """Yield every ``book-chapter-verse`` key in canonical order."""
+        for verse_id in self._ids:
+            yield f"{self.books[verse_id >> 16]}-{verse_id >> 8 & 0xFF}-{verse_id & 0xFF}"
+
+    def close(self):
+        if self._view is not None:
+            self._ids.release()
+            self._offsets.release()
+            self._view.release()
+        self._mm.close()
+
+
+_STORES = {}
+
+
+def open_store(module: str) -> CommentaryStore:
+    """Return the (cached) store for a module name such as ``"MHC"``."""
+    store = _STORES.get(module)
+    if store is None:
+        store = _STORES[module] = CommentaryStore(COMMENTARY_DIR / f"{module.lower()}.cstore")
+    return store
+
+
+def get_commentary(module: str, key: str):
+    """Return one verse's commentary from a module's store, or None."""
+    return open_store(module).get(key)
+
+
+def get_chapter(module: str, book: str, chapter: int) -> dict:
+    """Return {verse: text} for a chapter from a module's store."""
+    return open_store(module).get_chapter(book, chapter)
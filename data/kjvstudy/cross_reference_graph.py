@@ -0,0 +1,266 @@
+"""Cross-reference graph over every KJV verse, in one memory-mapped file.
+
+``scripts/build-cross-reference-graph.py`` compiles ``cross_references/*.json``
+into ``cross_references.graph``: one node per verse (all 31,102, in canonical
+order) and the references as compressed-sparse-row edge lists in both
+directions. Each edge carries an index into an interned table of note labels
+("Parallel theme", "Creation", ...). Opening the file maps it read-only;
+neighbor lookups are a binary search for the node plus a slice, and nothing
+is parsed but a small JSON header.
+
+    from data.kjvstudy.cross_reference_graph import open_graph
+
+    graph = open_graph()
+    graph.neighbors("Genesis 1:1")          # [(verse id, note), ...]
+    graph.references_to("John 3:16")        # verses that cite John 3:16
+    graph.k_hop("genesis-1-1", 2)           # {verse id: hops}
+    graph.most_connected("Romans", 8)       # [(verse id, edge count), ...]
+
+Verse ids are ``references`` ids; any form ``references.parse`` accepts may
+be passed instead. A reference that does not parse or is not a KJV verse, and
+an unknown book, give empty results rather than raising.
+"""
+
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from pathlib import Path
+
+from .references import MAX_CHAPTER, MAX_VERSE, book_number, iter_verses, pack, parse
+
+MAGIC = b"KJVXREF1"
+# magic, node count, edge count, header length
+_PREAMBLE = struct.Struct("<8sIII")
+
+GRAPH_PATH = Path(__file__).resolve().parent / "cross_references.graph"
+
+# (name, typecode, count from (nodes, edges)); uint32 arrays before uint16 so all stay aligned
+_ARRAYS = (
+    ("nodes", "I", lambda n, e: n),
+    ("out_offsets", "I", lambda n, e: n + 1),
+    ("out_targets", "I", lambda n, e: e),
+    ("in_offsets", "I", lambda n, e: n + 1),
+    ("in_sources", "I", lambda n, e: e),
+    ("out_labels", "H", lambda n, e: e),
+    ("in_labels", "H", lambda n, e: e),
+)
+
+
+def _layout(node_count, edge_count):
+    offsets = {}
+    pos = _PREAMBLE.size
+    for name, typecode, count in _ARRAYS:
+        size = count(node_count, edge_count) * array(typecode).itemsize
+        offsets[name] = (typecode, pos, pos + size)
+        pos += size
+    return offsets, pos
+
+
+def _le_array(typecode: str, values=()) -> array:
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _csr(node_count, edges):
+    """Offsets, targets and labels for (source node, target node, label) edges, grouped by source.
+
+    The sort is stable, so each node keeps its edges in source-file order.
+    """
+    edges = sorted(edges, key=lambda edge: edge[0])
+    offsets = array("I", [0] * (node_count + 1))
+    for source, _, _ in edges:
+        offsets[source + 1] += 1
+    for node in range(node_count):
+        offsets[node + 1] += offsets[node]
+    return offsets, array("I", (edge[1] for edge in edges)), array("H", (edge[2] for edge in edges))
+
+
+def write_graph(path, edges, meta=None):
+    """Write a graph file from (source verse id, target verse id, note) triples.
+
+    Returns (node count, edge count). The file is replaced atomically.
+    """
+    nodes = array("I", iter_verses())
+    node_of = {verse_id: node for node, verse_id in enumerate(nodes)}
+    labels = {}
+    node_edges = []
+    for source, target, note in edges:
+        label = labels.setdefault(note or "", len(labels))
+        node_edges.append((node_of[source], node_of[target], label))
+
+    out_offsets, out_targets, out_labels = _csr(len(nodes), node_edges)
+    # Reverse lists are ordered by citing verse, not by which book file came first
+    in_offsets, in_sources, in_labels = _csr(len(nodes), sorted((t, s, l) for s, t, l in node_edges))
+    arrays = {"nodes": nodes, "out_offsets": out_offsets, "out_targets": out_targets,
+              "in_offsets": in_offsets, "in_sources": in_sources,
+              "out_labels": out_labels, "in_labels": in_labels}
+
+    header = json.dumps(dict(meta or {}, labels=list(labels)), ensure_ascii=False).encode("utf-8")
+    tmp_path = Path(str(path) + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, len(nodes), len(node_edges), len(header)))
+        for name, typecode, _ in _ARRAYS:
+            f.write(_le_array(typecode, arrays[name]).tobytes())
+        f.write(header)
+    os.replace(tmp_path, path)
+    return len(nodes), len(node_edges)
+
+
+class CrossReferenceGraph:
+    """Memory-mapped reader over a file written by ``write_graph``."""
+
+    def __init__(self, path=GRAPH_PATH):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, node_count, edge_count, header_len = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a cross-reference graph")
+        layout, header_offset = _layout(node_count, edge_count)
+        header = json.loads(self._mm[header_offset:header_offset + header_len])
+        self.labels = header.pop("labels")
+        self.meta = header
+        self._view = None
+        if sys.byteorder == "little":
+            self._view = view = memoryview(self._mm)
+            arrays = {name: view[start:stop].cast(typecode) for name, (typecode, start, stop) in layout.items()}
+        else:
+            arrays = {name: _le_array(typecode, self._mm[start:stop])
+                      for name, (typecode, start, stop) in layout.items()}
+        self._arrays = arrays
+        self._nodes = arrays["nodes"]
+        self._out = (arrays["out_offsets"], arrays["out_targets"], arrays["out_labels"])
+        self._in = (arrays["in_offsets"], arrays["in_sources"], arrays["in_labels"])
+        self.edge_count = edge_count
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def _node(self, verse):
+        """Node index of a verse, or None if it does not parse or is not a KJV verse."""
+        try:
+            verse_id = parse(verse) if isinstance(verse, str) else verse
+        except ValueError:
+            return None
+        node = bisect_left(self._nodes, verse_id)
+        if node == len(self._nodes) or self._nodes[node] != verse_id:
+            return None
+        return node
+
+    def _edges(self, direction, node):
+        offsets, ends, labels = direction
+        start, stop = offsets[node], offsets[node + 1]
+        nodes = self._nodes
+        return [(nodes[end], self.labels[labels[i]]) for i, end in zip(range(start, stop), ends[start:stop])]
+
+    def _adjacent(self, node, direction):
+        """Node indexes adjacent to ``node``: 'out', 'in' or 'both'."""
+        if direction in ("out", "both"):
+            offsets, ends, _ = self._out
+            yield from ends[offsets[node]:offsets[node + 1]]
+        if direction in ("in", "both"):
+            offsets, ends, _ = self._in
+            yield from ends[offsets[node]:offsets[node + 1]]
+
+    def neighbors(self, verse) -> list:
+        """[(verse id, note)] for the verses ``verse`` refers to, in source order."""
+        node = self._node(verse)
+        return [] if node is None else self._edges(self._out, node)
+
+    def references_to(self, verse) -> list:
+        """[(verse id, note)] for the verses that refer to ``verse``, in canonical order."""
+        node = self._node(verse)
+        return [] if node is None else self._edges(self._in, node)
+
+    def degree(self, verse, direction="both") -> int:
+        node = self._node(verse)
+        if node is None:
+            return 0
+        total = 0
+        if direction in ("out", "both"):
+            total += self._out[0][node + 1] - self._out[0][node]
+        if direction in ("in", "both"):
+            total += self._in[0][node + 1] - self._in[0][node]
+        return total
+
+    def k_hop(self, verse, k=2, direction="out", limit=None) -> dict:
+        """{verse id: hops} for every verse within ``k`` hops of ``verse`` (excluding itself).
+
+        Breadth-first, so each verse gets its shortest distance. With ``limit``,
+        expansion stops after the first level that reaches that many verses.
+        """
+        start = self._node(verse)
+        if start is None:
+            return {}
+        seen = {start: 0}
+        frontier = [start]
+        for hops in range(1, k + 1):
+            next_frontier = []
+            for node in frontier:
+                for adjacent in self._adjacent(node, direction):
+                    if adjacent not in seen:
+                        seen[adjacent] = hops
+                        next_frontier.append(adjacent)
+            frontier = next_frontier
+            if not frontier or (limit is not None and len(seen) - 1 >= limit):
+                break
+        del seen[start]
+        return {self._nodes[node]: hops for node, hops in seen.items()}
+
+    def chapter_verses(self, book, chapter: int) -> list:
+        """Verse ids of a chapter (``book`` is a number or any book name)."""
+        start, stop = self._chapter_range(book, chapter)
+        return list(self._nodes[start:stop])
+
+    def _chapter_range(self, book, chapter):
+        """Node index range of a chapter; empty for an unknown book or chapter."""
+        try:
+            book = book_number(book) if isinstance(book, str) else book
+        except KeyError:
+            return 0, 0
+        if not 1 <= chapter <= MAX_CHAPTER:
+            return 0, 0
+        return (bisect_left(self._nodes, pack(book, chapter, 0)),
+                bisect_right(self._nodes, pack(book, chapter, MAX_VERSE)))
+
+    def most_connected(self, book, chapter: int, n=10, direction="both", include_chapter=False) -> list:
+        """[(verse id, edge count)] for the ``n`` verses with the most references to or from a chapter.
+
+        Verses inside the chapter itself are left out unless ``include_chapter``.
+        Ties go to the earlier verse.
+        """
+        start, stop = self._chapter_range(book, chapter)
+        counts = Counter()
+        for node in range(start, stop):
+            counts.update(self._adjacent(node, direction))
+        if not include_chapter:
+            for node in range(start, stop):
+                counts.pop(node, None)
+        top = heapq.nsmallest(n, counts.items(), key=lambda item: (-item[1], item[0]))
+        return [(self._nodes[node], count) for node, count in top]
+
+    def close(self):
+        if self._view is not None:
+            for arr in self._arrays.values():
+                arr.release()
+            self._view.release()
+        self._mm.close()
+
+
+_GRAPH = None
+
+
+def open_graph() -> CrossReferenceGraph:
+    """Return the (cached) graph at ``GRAPH_PATH``."""
+    global _GRAPH
+    if _GRAPH is None:
+        _GRAPH = CrossReferenceGraph(GRAPH_PATH)
+    return _GRAPH
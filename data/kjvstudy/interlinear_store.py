@@ -0,0 +1,245 @@
+"""Compact, memory-mapped interlinear corpus with per-chapter loading.
+
+``interlinear/*.json`` is one object per book (``{"Ruth:1:1": [word, ...]}``),
+so showing one verse means parsing the whole book, and the 170-character
+Strong's definition is repeated on every occurrence of a word.
+``scripts/build-interlinear-store.py`` reshards the corpus into
+``interlinear.store``:
+
+- a table of every distinct string (Hebrew/Greek word, transliteration,
+  English, parsing, definition), each stored once;
+- one row of seven uint32s per word: position, the string ids, and the
+  Strong's number as an integer (``strongs_index.encode_number``);
+- the sorted verse ids with the index of each verse's first row, so a verse
+  or a whole chapter is a binary search plus one contiguous slice.
+
+Opening the store maps it read-only. Chapters are decoded back into the
+original word dicts on demand and kept in an LRU.
+
+    from data.kjvstudy.interlinear_store import get_verse, get_chapter
+
+    get_verse("Ruth 1:1")        # [{"position": 1, "original": ..., "strongs": "H1961", ...}, ...]
+    get_chapter("Ruth", 1)       # {verse: [word, ...]}
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from pathlib import Path
+
+from .references import MAX_CHAPTER, MAX_VERSE, book_number, pack, parse
+from .strongs_index import decode_number, encode_number
+
+MAGIC = b"KJVILIN1"
+# magic, verse count, word count, string count, string bytes, header length
+_PREAMBLE = struct.Struct("<8sIIIII")
+
+STORE_PATH = Path(__file__).resolve().parent / "interlinear.store"
+
+# Row layout; "strongs" holds an encoded number, every other string field a string id
+FIELDS = ("position", "original", "transliteration", "strongs", "english", "parsing", "definition")
+_STRONGS = FIELDS.index("strongs")
+NO_STRONGS = 0xFFFFFFFF
+
+
+def _layout(verse_count, word_count, string_count, string_bytes):
+    offsets = {}
+    pos = _PREAMBLE.size
+    for name, typecode, count in (("verses", "I", verse_count), ("verse_rows", "I", verse_count + 1),
+                                  ("rows", "I", word_count * len(FIELDS)),
+                                  ("string_offsets", "I", string_count + 1),
+                                  ("strings", "B", string_bytes)):
+        size = count * array(typecode).itemsize
+        offsets[name] = (typecode, pos, pos + size)
+        pos += size
+    return offsets, pos
+
+
+def _le_array(typecode: str, values=()) -> array:
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def write_interlinear_store(path, verses, meta=None):
+    """Write a store from (verse id, [word dict]) pairs, in any order.
+
+    Returns (verse count, word count, string count). The file is replaced atomically.
+    """
+    string_ids = {"": 0}
+    strings = bytearray()
+    string_offsets = array("I", [0, 0])
+    by_verse = {}
+    for verse_id, words in verses:
+        if verse_id in by_verse:
+            raise ValueError(f"duplicate verse id {verse_id:#x}")
+        rows = array("I")
+        for word in words:
+            for i, field in enumerate(FIELDS):
+                value = word.get(field)
+                if i == _STRONGS:
+                    rows.append(encode_number(value) if value else NO_STRONGS)
+                elif field == "position":
+                    rows.append(value)
+                else:
+                    value = value or ""
+                    string_id = string_ids.get(value)
+                    if string_id is None:
+                        string_id = string_ids[value] = len(string_ids)
+                        strings += value.encode("utf-8")
+                        string_offsets.append(len(strings))
+                    rows.append(string_id)
+        by_verse[verse_id] = rows
+
+    verse_ids = array("I", sorted(by_verse))
+    verse_rows = array("I", [0])
+    rows = array("I")
+    for verse_id in verse_ids:
+        rows.extend(by_verse[verse_id])
+        verse_rows.append(len(rows) // len(FIELDS))
+    arrays = {"verses": verse_ids, "verse_rows": verse_rows, "rows": rows, "string_offsets": string_offsets}
+
+    header = json.dumps(meta or {}, ensure_ascii=False).encode("utf-8")
+    tmp_path = Path(str(path) + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, len(verse_ids), verse_rows[-1], len(string_ids), len(strings), len(header)))
+        for name in ("verses", "verse_rows", "rows", "string_offsets"):
+            f.write(_le_array("I", arrays[name]).tobytes())
+        f.write(strings)
+        f.write(header)
+    os.replace(tmp_path, path)
+    return len(verse_ids), verse_rows[-1], len(string_ids)
+
+
+class InterlinearStore:
+    """Memory-mapped reader over a file written by ``write_interlinear_store``."""
+
+    def __init__(self, path=STORE_PATH, cache_size=64):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, verse_count, word_count, string_count, string_bytes, header_len = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not an interlinear store")
+        layout, header_offset = _layout(verse_count, word_count, string_count, string_bytes)
+        self.meta = json.loads(self._mm[header_offset:header_offset + header_len])
+        self.word_count = word_count
+        self._view = view = memoryview(self._mm)
+        self._arrays = {}
+        for name, (typecode, start, stop) in layout.items():
+            if typecode == "B" or sys.byteorder == "little":
+                self._arrays[name] = view[start:stop].cast(typecode)
+            else:
+                self._arrays[name] = _le_array(typecode, self._mm[start:stop])
+        self._verses = self._arrays["verses"]
+        self._verse_rows = self._arrays["verse_rows"]
+        self._rows = self._arrays["rows"]
+        self._string_offsets = self._arrays["string_offsets"]
+        self._strings = self._arrays["strings"]
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
+    def __len__(self):
+        return len(self._verses)
+
+    def __contains__(self, reference):
+        verse_id = parse(reference) if isinstance(reference, str) else reference
+        i = bisect_left(self._verses, verse_id)
+        return i < len(self._verses) and self._verses[i] == verse_id
+
+    def _string(self, string_id: int) -> str:
+        offsets = self._string_offsets
+        return self._strings[offsets[string_id]:offsets[string_id + 1]].tobytes().decode("utf-8")
+
+    def _decode_chapter(self, start: int, stop: int) -> dict:
+        """{verse: [word dict]} for verse indexes ``start``..``stop``; repeated strings share one object."""
+        strings = {}
+        chapter = {}
+        width = len(FIELDS)
+        for i in range(start, stop):
+            words = []
+            row_start, row_stop = self._verse_rows[i] * width, self._verse_rows[i + 1] * width
+            rows = self._rows[row_start:row_stop].tolist()
+            for offset in range(0, len(rows), width):
+                row = rows[offset:offset + width]
+                word = {}
+                for field, value in zip(FIELDS, row):
+                    if field == "position":
+                        word[field] = value
+                    elif field == "strongs":
+                        word[field] = "" if value == NO_STRONGS else decode_number(value)
+                    else:
+                        text = strings.get(value)
+                        if text is None:
+                            text = strings[value] = self._string(value)
+                        word[field] = text
+                words.append(word)
+            chapter[self._verses[i] & 0xFF] = words
+        return chapter
+
+    def get_chapter(self, book, chapter: int) -> dict:
+        """{verse: [word dict]} for a chapter (``book`` is a number or any book name); {} if absent.
+
+        An unknown book gives {} too, like a chapter that is not in the store.
+        Decoded chapters are cached (LRU) and shared; copy before changing them.
+        """
+        try:
+            book = book_number(book) if isinstance(book, str) else book
+        except KeyError:
+            return {}
+        if not 1 <= chapter <= MAX_CHAPTER:
+            return {}
+        chapter_id = pack(book, chapter, 0)
+        cached = self._cache.get(chapter_id)
+        if cached is not None:
+            self._cache.move_to_end(chapter_id)
+            return cached
+        start = bisect_left(self._verses, chapter_id)
+        stop = bisect_right(self._verses, pack(book, chapter, MAX_VERSE))
+        result = self._decode_chapter(start, stop)
+        self._cache[chapter_id] = result
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def get_verse(self, reference):
+        """The word list for a verse id or any reference ``references.parse`` accepts, or None."""
+        verse_id = parse(reference) if isinstance(reference, str) else reference
+        return self.get_chapter(verse_id >> 16, verse_id >> 8 & 0xFF).get(verse_id & 0xFF)
+
+    def verse_ids(self):
+        """Packed ids of every verse in the store, in canonical order."""
+        return iter(self._verses)
+
+    def close(self):
+        self._cache.clear()
+        for arr in self._arrays.values():
+            if isinstance(arr, memoryview):
+                arr.release()
+        self._view.release()
+        self._mm.close()
+
+
+_STORE = None
+
+
+def open_store() -> InterlinearStore:
+    """Return the (cached) store at ``STORE_PATH``."""
+    global _STORE
+    if _STORE is None:
+        _STORE = InterlinearStore(STORE_PATH)
+    return _STORE
+
+
+def get_verse(reference):
+    return open_store().get_verse(reference)
+
+
+def get_chapter(book, chapter: int) -> dict:
+    return open_store().get_chapter(book, chapter)
@@ -0,0 +1,253 @@
+"""Markup-to-text conversion for commentary sources.
+
+``osis_to_text`` (SWORD OSIS) and ``html_to_text`` (BibleHub HTML) apply all
+of their tag rules in a single scan over the markup, followed by one
+normalisation pass (plus one entity pass for HTML). They produce exactly the
+same output as the original multi-pass regex pipelines, kept here as
+``strip_osis_regex`` and ``clean_html_regex``. Inputs whose result depends on
+pass ordering (nested ``<hi>``/``<span>`` elements, element content that
+crosses a line, stray ``<`` inside a tag, unclosed elements) are handed to
+those pipelines unchanged.
+"""
+
+import re
+
+
+class _Fallback(Exception):
+    """Raised when the single-pass scan cannot guarantee regex-identical output."""
+
+
+def strip_osis_regex(text):
+    """Strip OSIS XML markup to plain text, preserving paragraph breaks."""
+    # Convert paragraph/div breaks to newlines
+    text = re.sub(r'<div[^>]*type="x-p"[^>]*/>', '\n', text)
+    text = re.sub(r'<div[^>]*>', '', text)
+    text = re.sub(r'</div>', '', text)
+    # Convert <hi type="bold"> to **bold**
+    text = re.sub(r'<hi type="bold">(.*?)</hi>', r'**\1**', text)
+    # Convert <hi type="italic"> to *italic*
+    text = re.sub(r'<hi type="italic">(.*?)</hi>', r'*\1*', text)
+    # Convert <hi type="super"> (verse numbers)
+    text = re.sub(r'<hi type="super">(\d+)</hi>', r'[\1]', text)
+    # Convert <hi type="small-caps"> (LORD etc)
+    text = re.sub(r'<hi type="small-caps">(.*?)</hi>', lambda m: m.group(1).upper(), text)
+    # Convert scripture references to plain text
+    text = re.sub(r'<reference[^>]*>(.*?)</reference>', r'\1', text)
+    # Strip remaining tags
+    text = re.sub(r'<[^>]+>', '', text)
+    # Clean whitespace
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r'[ \t]+', ' ', text)
+    return text.strip()
+
+
+def clean_html_regex(text):
+    """Strip HTML tags and clean up commentary text."""
+    text = re.sub(r'<span class=\s*"bld">(.*?)</span>', r'**\1**', text)
+    text = re.sub(r'<span class=\s*"ital">(.*?)</span>', r'*\1*', text)
+    text = re.sub(r'<a[^>]*>(.*?)</a>', r'\1', text)
+    text = re.sub(r'<p>', '\n', text)
+    text = re.sub(r'<br\s*/?>', '\n', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = text.replace('&mdash;', '--').replace('&ndash;', '-')
+    text = text.replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
+    text = text.replace('&quot;', '"').replace('&#39;', "'")
+    text = re.sub(r'&#\d+;', '', text)
+    text = re.sub(r'&\w+;', '', text)
+    text = re.sub(r'[ \t]+', ' ', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+# Splits markup into [text, tag, text, tag, ..., text]; tags get the same
+# extent the regex pipelines' `<[^>]+>` gives them
+_TAG_SPLIT_RE = re.compile(r'(<[^>]+>)')
+# A tag with a stray "<" inside it: the element patterns would start matching mid-tag
+_NESTED_LT_RE = re.compile(r'<[^>]*<[^>]*>')
+
+_NEWLINES_RE = re.compile(r'\n{3,}')
+# Runs of spaces/tabs; single spaces are already what `[ \t]+` -> " " produces
+_SPACES_RE = re.compile(r'[ \t]{2,}|\t')
+
+
+def _tidy(text):
+    """Collapse blank-line runs and horizontal whitespace, then strip."""
+    if '\n\n\n' in text:
+        text = _NEWLINES_RE.sub('\n\n', text)
+    # Substring checks are far cheaper than letting the regex visit every space
+    if '  ' in text or '\t' in text:
+        text = _SPACES_RE.sub(' ', text)
+    return text.strip()
+
+
+_OSIS_HI = {
+    '<hi type="bold">': 'bold',
+    '<hi type="italic">': 'italic',
+    '<hi type="super">': 'super',
+    '<hi type="small-caps">': 'small-caps',
+}
+
+
+def _scan_osis(text):
+    """Apply every OSIS rule in one pass over the tags. Raises _Fallback when unsure."""
+    pieces = _TAG_SPLIT_RE.split(text)
+    out = [pieces[0]]
+    # Open elements as (kind, parent parts); <hi> and <reference> never nest here
+    stack = []
+    hi = ref = False
+
+    for i in range(1, len(pieces), 2):
+        tag = pieces[i]
+        if stack:
+            # Element patterns are `.*?` without DOTALL: they never span a line
+            if '\n' in tag:
+                raise _Fallback
+            # <hi type="super"> only matches bare digits, so any child tag changes the outcome
+            if stack[-1][0] == 'super' and tag != '</hi>':
+                raise _Fallback
+
+        if tag == '</hi>':
+            if hi and stack[-1][0] != 'reference':
+                kind, parent = stack.pop()
+                content = ''.join(out)
+                if kind == 'bold':
+                    content = f'**{content}**'
+                elif kind == 'italic':
+                    content = f'*{content}*'
+                elif kind == 'super':
+                    if content.isdecimal():
+                        content = f'[{content}]'
+                else:
+                    content = content.upper()
+                out = parent
+                out.append(content)
+                hi = False
+            elif hi:
+                raise _Fallback
+        elif tag == '</reference>':
+            if ref and stack[-1][0] == 'reference':
+                content = ''.join(out)
+                out = stack.pop()[1]
+                out.append(content)
+                ref = False
+            elif ref:
+                raise _Fallback
+        elif tag.startswith('<hi'):
+            # The first </hi> would close the outer element in the regex pipeline
+            if hi:
+                raise _Fallback
+            kind = _OSIS_HI.get(tag)
+            if kind:
+                stack.append((kind, out))
+                out = []
+                hi = True
+        elif tag.startswith('<reference'):
+            if ref:
+                raise _Fallback
+            stack.append(('reference', out))
+            out = []
+            ref = True
+        elif tag.startswith('<div') and tag.endswith('/>') and 'type="x-p"' in tag[4:-2]:
+            if stack:
+                raise _Fallback
+            out.append('\n')
+        # Every other tag is dropped
+
+        chunk = pieces[i + 1]
+        if chunk:
+            if stack and '\n' in chunk:
+                raise _Fallback
+            out.append(chunk)
+
+    if stack:
+        raise _Fallback
+    return ''.join(out)
+
+
+def osis_to_text(text):
+    """Strip OSIS XML markup to plain text, preserving paragraph breaks."""
+    if '<' in text:
+        if _NESTED_LT_RE.search(text):
+            return strip_osis_regex(text)
+        try:
+            text = _scan_osis(text)
+        except _Fallback:
+            return strip_osis_regex(text)
+    return _tidy(text)
+
+
+_SPAN_RE = re.compile(r'<span class=\s*"(bld|ital)">')
+_BR_RE = re.compile(r'<br\s*/?>')
+
+# Entities the regex pipeline re-expands in a later pass: &amp; followed by an
+# entity-like tail, or a deleted &#NNN; that joins "&word" with a following ";"
+_ENTITY_CHAIN_RE = re.compile(r'&amp;[#\w]|&[\w;]*&#\d+;')
+_ENTITY_RE = re.compile(r'&(?:mdash|ndash|amp|lt|gt|quot|#39);|&#\d+;|&\w+;')
+_ENTITIES = {
+    '&mdash;': '--', '&ndash;': '-', '&amp;': '&', '&lt;': '<', '&gt;': '>',
+    '&quot;': '"', '&#39;': "'",
+}
+
+
+def _replace_entity(match):
+    return _ENTITIES.get(match.group(), '')
+
+
+def _scan_html(text):
+    """Apply every HTML tag rule in one pass over the tags. Raises _Fallback when unsure."""
+    pieces = _TAG_SPLIT_RE.split(text)
+    out = [pieces[0]]
+    # The single open <span class="bld|ital">, if any, and the parts outside it
+    span = parent = None
+
+    for i in range(1, len(pieces), 2):
+        tag = pieces[i]
+        if span:
+            if '\n' in tag:
+                raise _Fallback
+        if tag == '</span>':
+            if span:
+                content = ''.join(out)
+                out = parent
+                out.append(f'**{content}**' if span == 'bld' else f'*{content}*')
+                span = None
+        elif tag == '<p>':
+            out.append('\n')
+        elif tag.startswith('<span'):
+            # The first </span> would close the outer element in the regex pipeline
+            if span:
+                raise _Fallback
+            match = _SPAN_RE.fullmatch(tag)
+            if match:
+                span, parent, out = match.group(1), out, []
+        elif tag.startswith('<br') and _BR_RE.fullmatch(tag):
+            out.append('\n')
+        # Every other tag, <a ...> and </a> included, is dropped
+
+        chunk = pieces[i + 1]
+        if chunk:
+            if span and '\n' in chunk:
+                raise _Fallback
+            out.append(chunk)
+
+    if span:
+        raise _Fallback
+    return ''.join(out)
+
+
+def html_to_text(text):
+    """Strip HTML tags and clean up commentary text."""
+    out = text
+    if '<' in out:
+        if _NESTED_LT_RE.search(out):
+            return clean_html_regex(text)
+        try:
+            out = _scan_html(out)
+        except _Fallback:
+            return clean_html_regex(text)
+    if '&' in out:
+        if _ENTITY_CHAIN_RE.search(out):
+            return clean_html_regex(text)
+        out = _ENTITY_RE.sub(_replace_entity, out)
+    # clean_html collapses spaces before blank lines; the two never interact
+    return _tidy(out)
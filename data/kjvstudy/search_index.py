@@ -0,0 +1,626 @@
+"""Full-text BM25 search over verse commentary, commentary modules and resources.
+
+``scripts/build-search-index.py`` tokenizes every document (HTML stripped,
+lowercased, stop words dropped, light Porter stemming) and writes
+``search.index``: a sorted term dictionary, per-term postings of
+delta-encoded document ids and term frequencies, and per-term position lists,
+all varint-compressed, plus per-document verse id, source and length arrays.
+Opening the file maps it read-only; a query decodes only the postings of its
+own terms.
+
+Queries are not all single-digit milliseconds. Cold (nothing cached, norms
+already built), a rare term takes well under 1 ms and "lord" or a
+book-filtered "grace" about 2 ms, but "god" (23,000 postings) takes about
+8 ms, the phrase "lamb of god" about 17 ms and "the lord god of israel"
+about 23 ms: every posting of every query term is decoded and weighted.
+The first query after opening also pays about 3 ms to build the length
+norms. Repeated terms come from the LRU caches.
+
+    from data.kjvstudy.search_index import open_index
+
+    index = open_index()
+    index.search("propitiation")                       # [Hit(score, source, key, verse_id), ...]
+    index.search('"lamb of god" sin', testament="nt")  # phrase plus a ranked term
+    index.search("covenant", book="Genesis", source="verse_commentary")
+
+Verse ids are ``references`` ids (documents without a verse, such as
+resources, have ``NO_VERSE``).
+"""
+
+import heapq
+import html
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from itertools import accumulate
+from operator import itemgetter
+from pathlib import Path
+
+from .references import book_number
+
+MAGIC = b"KJVSRCH1"
+# magic, header length (the JSON header follows, then the arrays and blobs it describes)
+_PREAMBLE = struct.Struct("<8sI")
+
+INDEX_PATH = Path(__file__).resolve().parent / "search.index"
+
+NO_VERSE = 0xFFFFFFFF
+OT_BOOK_COUNT = 39
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+Hit = namedtuple("Hit", "score source key verse_id")
+
+# --- Analysis ---------------------------------------------------------------
+
+_TAG = re.compile(r"<[^>]*>")
+_WORD = re.compile(r"[^\W_]+")
+_PHRASE = re.compile(r'"([^"]*)"')
+# A run of continuation bytes and the byte that ends it: one multi-byte varint
+_MULTI_BYTE_VARINT = re.compile(rb"[\x80-\xff]+[\x00-\x7f]")
+_HIGH_BYTES = bytes(range(0x80, 0x100))
+# Maps the byte that ends a varint to 1 and continuation bytes to 0
+_VARINT_ENDS = bytes.maketrans(bytes(range(256)), bytes(int(byte < 0x80) for byte in range(256)))
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from had has have he her his i in into is it its
+not of on or our she so than that the their them then there these they this to
+was we were which who will with you your
+""".split())
+
+
+def _is_consonant(word, i):
+    if word[i] in "aeiou":
+        return False
+    if word[i] == "y":
+        return i == 0 or not _is_consonant(word, i - 1)
+    return True
+
+
+def _measure(stem):
+    """Porter's m: the number of vowel-consonant sequences in ``stem``."""
+    m = 0
+    previous_vowel = False
+    for i in range(len(stem)):
+        consonant = _is_consonant(stem, i)
+        if consonant and previous_vowel:
+            m += 1
+        previous_vowel = not consonant
+    return m
+
+
+def _has_vowel(stem):
+    return any(not _is_consonant(stem, i) for i in range(len(stem)))
+
+
+def _ends_cvc(word):
+    n = len(word)
+    return (n >= 3 and _is_consonant(word, n - 3) and not _is_consonant(word, n - 2)
+            and _is_consonant(word, n - 1) and word[-1] not in "wxy")
+
+
+@lru_cache(maxsize=200000)
+def stem(word: str) -> str:
+    """Porter stemmer steps 1 and 5a (plurals, -ed/-ing, final -y/-e) for ASCII words.
+
+    Only inflections are removed, so "propitiation" and "propitiations" share
+    a stem but "propitiatory" does not. Other scripts pass through unchanged.
+    """
+    if len(word) <= 2 or not word.isascii():
+        return word
+    # Step 1a
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    # Step 1b
+    if word.endswith("eed"):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ("ed", "ing"):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(("at", "bl", "iz")):
+                    word += "e"
+                elif len(word) >= 2 and word[-1] == word[-2] and _is_consonant(word, len(word) - 1) \
+                        and word[-1] not in "lsz":
+                    word = word[:-1]
+                elif _measure(word) == 1 and _ends_cvc(word):
+                    word += "e"
+                break
+    # Step 1c
+    if word.endswith("y") and _has_vowel(word[:-1]):
+        word = word[:-1] + "i"
+    # Step 5a, so "believe" meets "believed"
+    if word.endswith("e"):
+        m = _measure(word[:-1])
+        if m > 1 or (m == 1 and not _ends_cvc(word[:-1])):
+            word = word[:-1]
+    return word
+
+
+def analyze(text: str):
+    """Yield (position, term) for every indexed word; stop words keep their positions."""
+    text = html.unescape(_TAG.sub(" ", text)).lower()
+    for position, match in enumerate(_WORD.finditer(text)):
+        word = match.group()
+        if word not in STOP_WORDS:
+            yield position, stem(word)
+
+
+# --- Varint coding ----------------------------------------------------------
+
+def encode_varints(values, out: bytearray):
+    """Append unsigned LEB128 varints to ``out``."""
+    for value in values:
+        while value >= 0x80:
+            out.append(value & 0x7F | 0x80)
+            value >>= 7
+        out.append(value)
+
+
+def decode_varints(buf) -> list:
+    """Decode unsigned LEB128 varints.
+
+    Postings are almost all one-byte varints, so when multi-byte ones are
+    rare, the runs between them are copied straight into the list and only
+    the multi-byte ones are decoded in Python.
+    """
+    data = bytes(buf)
+    if (len(data) - len(data.translate(None, _HIGH_BYTES))) * 16 > len(data):
+        return _decode_varints_bytewise(data)
+    values = []
+    start = 0
+    for match in _MULTI_BYTE_VARINT.finditer(data):
+        values += data[start:match.start()]
+        value = shift = 0
+        for byte in match.group():
+            value |= (byte & 0x7F) << shift
+            shift += 7
+        values.append(value)
+        start = match.end()
+    values += data[start:]
+    return values
+
+
+def _decode_varints_bytewise(data) -> list:
+    values = []
+    value = shift = 0
+    for byte in data:
+        if byte < 0x80:
+            values.append(value | byte << shift)
+            value = shift = 0
+        else:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+    return values
+
+
+class PostingsBuilder:
+    """Positional postings for a run of documents numbered from 0.
+
+    ``chunks()`` encodes each term's postings so that runs built in separate
+    processes can be concatenated by ``write_index`` without decoding them.
+    """
+
+    def __init__(self):
+        self.docs = []      # (source, key, verse id, length)
+        self._postings = {}
+
+    def add(self, source: str, key: str, verse_id: int, text: str):
+        doc = len(self.docs)
+        length = 0
+        positions = {}
+        for position, term in analyze(text):
+            positions.setdefault(term, []).append(position)
+            length += 1
+        for term, term_positions in positions.items():
+            self._postings.setdefault(term, []).append((doc, term_positions))
+        self.docs.append((source, key, verse_id, length))
+
+    def chunks(self) -> dict:
+        """{term: (first doc, last doc, doc count, postings tail, positions)}.
+
+        The postings tail is everything after the first document's delta:
+        that document's term frequency, then (doc delta, frequency) pairs.
+        """
+        chunks = {}
+        for term, docs in self._postings.items():
+            tail, positions = bytearray(), bytearray()
+            previous = docs[0][0]
+            encode_varints([len(docs[0][1])], tail)
+            for doc, term_positions in docs:
+                if doc != docs[0][0]:
+                    encode_varints((doc - previous, len(term_positions)), tail)
+                    previous = doc
+                last = 0
+                for position in term_positions:
+                    encode_varints([position - last], positions)
+                    last = position
+            chunks[term] = (docs[0][0], previous, len(docs), bytes(tail), bytes(positions))
+        return chunks
+
+
+# --- File layout ------------------------------------------------------------
+
+# (name, typecode); 8-byte arrays first so everything stays aligned
+_ARRAYS = (
+    ("term_postings", "Q"), ("term_positions", "Q"),
+    ("doc_verse", "I"), ("doc_length", "I"), ("doc_key_offsets", "I"),
+    ("term_offsets", "I"), ("term_doc_freq", "I"),
+    ("doc_source", "H"),
+)
+_BLOBS = ("doc_keys", "terms", "postings", "positions")
+
+
+def _le_array(typecode: str, values=()) -> array:
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def write_index(path, runs, meta=None):
+    """Write an index file from PostingsBuilder runs, given as (docs, chunks) pairs in document order.
+
+    Returns (document count, term count). The file is replaced atomically.
+    """
+    sources = []
+    source_ids = {}
+    doc_verse, doc_length, doc_source = array("I"), array("I"), array("H")
+    doc_keys, doc_key_offsets = bytearray(), array("I", [0])
+    term_runs = {}
+    base = 0
+    for docs, chunks in runs:
+        for source, key, verse_id, length in docs:
+            if source not in source_ids:
+                source_ids[source] = len(sources)
+                sources.append(source)
+            doc_source.append(source_ids[source])
+            doc_verse.append(NO_VERSE if verse_id is None else verse_id)
+            doc_length.append(length)
+            doc_keys += key.encode("utf-8")
+            doc_key_offsets.append(len(doc_keys))
+        for term, chunk in chunks.items():
+            term_runs.setdefault(term, []).append((base, chunk))
+        base += len(docs)
+
+    terms, term_offsets, term_doc_freq = bytearray(), array("I", [0]), array("I")
+    postings, positions = bytearray(), bytearray()
+    term_postings, term_positions = array("Q", [0]), array("Q", [0])
+    for term in sorted(term_runs, key=lambda t: t.encode("utf-8")):
+        previous = 0
+        doc_freq = 0
+        for run_base, (first, last, count, tail, run_positions) in term_runs[term]:
+            encode_varints([run_base + first - previous], postings)
+            postings += tail
+            positions += run_positions
+            previous = run_base + last
+            doc_freq += count
+        terms += term.encode("utf-8")
+        term_offsets.append(len(terms))
+        term_doc_freq.append(doc_freq)
+        term_postings.append(len(postings))
+        term_positions.append(len(positions))
+
+    arrays = {"term_postings": term_postings, "term_positions": term_positions,
+              "doc_verse": doc_verse, "doc_length": doc_length, "doc_key_offsets": doc_key_offsets,
+              "term_offsets": term_offsets, "term_doc_freq": term_doc_freq, "doc_source": doc_source}
+    blobs = {"doc_keys": doc_keys, "terms": terms, "postings": postings, "positions": positions}
+
+    # Offsets are relative to the end of the header, so they do not depend on its length
+    layout = {}
+    pos = 0
+    for name, typecode in _ARRAYS:
+        size = len(arrays[name]) * array(typecode).itemsize
+        layout[name] = [typecode, pos, pos + size]
+        pos += size
+    for name in _BLOBS:
+        layout[name] = [None, pos, pos + len(blobs[name])]
+        pos += len(blobs[name])
+    header = json.dumps(dict(
+        meta or {}, sources=sources, layout=layout, documents=len(doc_verse),
+        average_length=sum(doc_length) / len(doc_length) if doc_length else 0.0,
+    ), ensure_ascii=False).encode("utf-8")
+    header += b" " * (-(_PREAMBLE.size + len(header)) % 8)
+
+    tmp_path = Path(str(path) + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, len(header)))
+        f.write(header)
+        for name, typecode in _ARRAYS:
+            f.write(_le_array(typecode, arrays[name]).tobytes())
+        for name in _BLOBS:
+            f.write(blobs[name])
+    os.replace(tmp_path, path)
+    return len(doc_verse), len(term_doc_freq)
+
+
+# --- Query engine -----------------------------------------------------------
+
+class SearchIndex:
+    """Memory-mapped BM25 query engine over a file written by ``write_index``."""
+
+    def __init__(self, path=INDEX_PATH, cache_size=256):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a search index")
+        base = _PREAMBLE.size + header_len
+        header = json.loads(self._mm[_PREAMBLE.size:base])
+        self.sources = header["sources"]
+        self.document_count = header["documents"]
+        self.average_length = header["average_length"] or 1.0
+        self._source_ids = {source: i for i, source in enumerate(self.sources)}
+        self._view = view = memoryview(self._mm)
+        self._blobs = {}
+        self._arrays = {}
+        for name, (typecode, start, stop) in header["layout"].items():
+            if typecode is None:
+                self._blobs[name] = view[base + start:base + stop]
+            elif sys.byteorder == "little":
+                self._arrays[name] = view[base + start:base + stop].cast(typecode)
+            else:
+                self._arrays[name] = _le_array(typecode, self._mm[base + start:base + stop])
+        self._cache = OrderedDict()
+        self._position_cache = OrderedDict()
+        self._cache_size = cache_size
+        self._norms = None
+
+    def __len__(self):
+        return self.document_count
+
+    def _term_slot(self, term: str):
+        """Binary search of the sorted term dictionary."""
+        target = term.encode("utf-8")
+        offsets = self._arrays["term_offsets"]
+        terms = self._blobs["terms"]
+        lo, hi = 0, len(offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if terms[offsets[mid]:offsets[mid + 1]].tobytes() < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(offsets) - 1 and terms[offsets[lo]:offsets[lo + 1]].tobytes() == target:
+            return lo
+        return None
+
+    def postings(self, term: str):
+        """(doc ids, term frequencies, BM25 weights) for an analyzed term, decoded once and cached (LRU).
+
+        A weight is the term's whole BM25 contribution to that document, so
+        scoring a cached term is a single pass of additions.
+        """
+        cached = self._cache.get(term)
+        if cached is not None:
+            self._cache.move_to_end(term)
+            return cached
+        slot = self._term_slot(term)
+        if slot is None:
+            result = ([], [], [])
+        else:
+            offsets = self._arrays["term_postings"]
+            values = decode_varints(self._blobs["postings"][offsets[slot]:offsets[slot + 1]])
+            docs, freqs = list(accumulate(values[0::2])), values[1::2]
+            idf = math.log(1 + (self.document_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            scale = idf * (K1 + 1)
+            weights = [scale * freq / (freq + length_norm)
+                       for freq, length_norm in zip(freqs, map(self._length_norms().__getitem__, docs))]
+            result = (docs, freqs, weights)
+        self._cache[term] = result
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _length_norms(self):
+        """BM25's per-document length normalisation, ``K1 * (1 - B + B * length / average)``, computed once."""
+        if self._norms is None:
+            base = K1 * (1 - B)
+            norm = K1 * B / self.average_length
+            self._norms = [base + norm * length for length in self._arrays["doc_length"]]
+        return self._norms
+
+    def _position_locator(self, term: str):
+        """A term's encoded position deltas, which bytes end a varint, and each posting's first varint; cached (LRU).
+
+        A phrase only needs the positions of its candidate documents, so
+        ``_positions`` finds their bytes by counting varint ends rather than
+        decoding a common term's whole list.
+        """
+        cached = self._position_cache.get(term)
+        if cached is not None:
+            self._position_cache.move_to_end(term)
+            return cached
+        offsets = self._arrays["term_positions"]
+        slot = self._term_slot(term)
+        data = self._blobs["positions"][offsets[slot]:offsets[slot + 1]].tobytes()
+        starts = list(accumulate(self.postings(term)[1], initial=0))
+        result = self._position_cache[term] = (data, data.translate(_VARINT_ENDS), starts)
+        if len(self._position_cache) > self._cache_size:
+            self._position_cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _varint_offset(ends, cursor, target: int) -> int:
+        """Byte offset of varint number ``target``.
+
+        ``cursor`` is a [varint number, byte offset] pair the walk starts from
+        (when it is not past ``target``) and is left at the result, so
+        visiting postings in order reads each byte of ``ends`` about once.
+        """
+        number, offset = cursor if cursor[0] <= target else (0, 0)
+        while number < target:
+            # At most one varint per byte, so this never overshoots
+            stop = offset + target - number
+            number += ends.count(1, offset, stop)
+            offset = stop
+        cursor[:] = number, offset
+        return offset
+
+    @classmethod
+    def _positions(cls, locator, cursor, i: int):
+        """Positions in the ``i``-th posting of the term ``locator`` came from."""
+        data, ends, starts = locator
+        start = cls._varint_offset(ends, cursor, starts[i])
+        stop = cls._varint_offset(ends, cursor, starts[i + 1])
+        return accumulate(decode_varints(data[start:stop]))
+
+    def _phrase_docs(self, phrase, candidates=None):
+        """Docs (within ``candidates``, if given) where the (position, term) sequence occurs with the same spacing.
+
+        Candidates start from the phrase's rarest term and are narrowed by
+        binary search in the others' postings, so common words like "god"
+        never have their whole postings list turned into a set.
+        """
+        terms = sorted(dict.fromkeys(term for _, term in phrase), key=lambda term: len(self.postings(term)[0]))
+        rarest = self.postings(terms[0])[0]
+        docs = rarest if candidates is None else [doc for doc in rarest if doc in candidates]
+        if not docs:
+            return set()
+        lookups = [(offset, self.postings(term)[0], self._position_locator(term), [0, 0])
+                   for offset, term in phrase]
+        matched = set()
+        for doc in docs:
+            starts = None
+            for offset, term_docs, locator, cursor in lookups:
+                i = bisect_left(term_docs, doc)
+                if i == len(term_docs) or term_docs[i] != doc:
+                    starts = None
+                    break
+                found = {p - offset for p in self._positions(locator, cursor, i)}
+                starts = found if starts is None else starts & found
+                if not starts:
+                    break
+            if starts:
+                matched.add(doc)
+        return matched
+
+    def _filter(self, book=None, testament=None, source=None):
+        """A predicate over doc ids, or None when no filter is given."""
+        if book is None and testament is None and source is None:
+            return None
+        verses = self._arrays["doc_verse"]
+        sources = self._arrays["doc_source"]
+        book_num = book_number(book) if isinstance(book, str) else book
+        source_id = self._source_ids.get(source, -1) if source is not None else None
+
+        def allowed(doc):
+            if source_id is not None and sources[doc] != source_id:
+                return False
+            if book_num is None and testament is None:
+                return True
+            verse_id = verses[doc]
+            if verse_id == NO_VERSE:
+                return False
+            doc_book = verse_id >> 16
+            if book_num is not None and doc_book != book_num:
+                return False
+            return testament is None or (doc_book < OT_BOOK_COUNT) == (testament.lower() == "ot")
+        return allowed
+
+    def search(self, query: str, limit=10, book=None, testament=None, source=None) -> list:
+        """Rank documents for ``query`` by BM25. Returns up to ``limit`` Hits, best first.
+
+        Quoted parts of the query are phrases every result must contain; the
+        other words are ranked but optional (any one may match). Filter by
+        ``book`` (name or number), ``testament`` ("ot"/"nt") or ``source``
+        (e.g. "verse_commentary", "resources" or a commentary module name);
+        an unknown book or source gives no results.
+        """
+        phrases = [list(analyze(text)) for text in _PHRASE.findall(query)]
+        phrases = [phrase for phrase in phrases if phrase]
+        terms = [term for phrase in phrases for _, term in phrase]
+        terms += [term for _, term in analyze(_PHRASE.sub(" ", query))]
+        if not terms:
+            return []
+
+        try:
+            allowed = self._filter(book, testament, source)
+        except KeyError:
+            # An unknown book name matches no document
+            return []
+        required = None
+        for phrase in phrases:
+            required = self._phrase_docs(phrase, required)
+            if not required:
+                return []
+
+        unique_terms = list(dict.fromkeys(terms))
+        if required is None and len(unique_terms) == 1:
+            # One term: its postings already are the scores, no dict needed
+            docs, _, weights = self.postings(unique_terms[0])
+            items = zip(docs, weights)
+            if allowed is not None:
+                items = (item for item in items if allowed(item[0]))
+            best = heapq.nlargest(limit, items, key=itemgetter(1))
+            return [self._hit(doc, score) for doc, score in best]
+
+        scores = {}
+        for term in unique_terms:
+            docs, _, weights = self.postings(term)
+            if required is not None:
+                for doc, weight in zip(docs, weights):
+                    if doc in required:
+                        scores[doc] = scores.get(doc, 0.0) + weight
+            elif not scores:
+                scores = dict(zip(docs, weights))
+            else:
+                for doc, weight in zip(docs, weights):
+                    scores[doc] = scores.get(doc, 0.0) + weight
+
+        if allowed is not None:
+            best = heapq.nlargest(limit, (item for item in scores.items() if allowed(item[0])),
+                                  key=lambda item: item[1])
+        else:
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [self._hit(doc, score) for doc, score in best]
+
+    def _hit(self, doc, score):
+        offsets = self._arrays["doc_key_offsets"]
+        key = self._blobs["doc_keys"][offsets[doc]:offsets[doc + 1]].tobytes().decode("utf-8")
+        verse_id = self._arrays["doc_verse"][doc]
+        return Hit(score, self.sources[self._arrays["doc_source"][doc]], key,
+                   None if verse_id == NO_VERSE else verse_id)
+
+    def close(self):
+        self._cache.clear()
+        self._position_cache.clear()
+        for arr in self._arrays.values():
+            if isinstance(arr, memoryview):
+                arr.release()
+        for blob in self._blobs.values():
+            blob.release()
+        self._view.release()
+        self._mm.close()
+
+
+_INDEX = None
+
+
+def open_index() -> SearchIndex:
+    """Return the (cached) index at ``INDEX_PATH``."""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = SearchIndex(INDEX_PATH)
+    return _INDEX
+
+
+def search(query: str, limit=10, **filters) -> list:
+    """Search the default index; see ``SearchIndex.search``."""
+    return open_index().search(query, limit, **filters)
@@ -0,0 +1,160 @@
+"""Read-only, memory-mapped resource store shared by worker processes.
+
+The store is one file: a magic tag, a JSON table of contents and a data region
+holding every resource item as its own JSON blob. Opening it maps the file
+read-only, so all workers on a host share the same page-cache copy and each
+process only keeps the table of contents plus the items it actually decodes.
+
+Build it with ``python scripts/build-resource-snapshot.py --store`` and enable
+it with ``KJVSTUDY_RESOURCE_STORE=/path/to/resources.store``.
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+
+MAGIC = b"KJVRSTO1"
+# magic, header length
+_PREAMBLE = struct.Struct("<8sI")
+
+
+def write_store(path: Path, data: dict, slug_for, meta: dict) -> Path:
+    """Write {category: {subcategory: {item: value}}} to a store file.
+
+    ``slug_for`` maps an item name to its slug; ``meta`` is stored in the
+    header (e.g. the source hash used for freshness checks).
+    """
+    blobs = bytearray()
+
+    def add(value):
+        raw = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        offset = len(blobs)
+        blobs.extend(raw)
+        return [offset, len(raw)]
+
+    toc = {}
+    for key, category in data.items():
+        entries = []
+        for sub_name, sub_value in category.items():
+            if isinstance(sub_value, dict):
+                items = [[item_name, slug_for(item_name)] + add(item_value)
+                         for item_name, item_value in sub_value.items()]
+                entries.append([sub_name, "items", items])
+            else:
+                entries.append([sub_name, "value"] + add(sub_value))
+        toc[key] = entries
+
+    header = json.dumps(dict(meta, toc=toc), ensure_ascii=False).encode("utf-8")
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, len(header)))
+        f.write(header)
+        f.write(blobs)
+    os.replace(tmp_path, path)
+    return path
+
+
+class SharedResourceStore:
+    """Memory-mapped view over a store file written by ``write_store``."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a resource store")
+        start = _PREAMBLE.size
+        self.meta = json.loads(self._mm[start:start + header_len])
+        self._toc = self.meta.pop("toc")
+        self._base = start + header_len
+        self._categories = {}
+
+    def _decode(self, offset: int, length: int):
+        start = self._base + offset
+        return json.loads(self._mm[start:start + length])
+
+    def __contains__(self, key):
+        return key in self._toc
+
+    def category(self, key: str) -> "CategoryView":
+        """Return the read-only mapping for a resource category."""
+        view = self._categories.get(key)
+        if view is None:
+            view = self._categories[key] = CategoryView(self, self._toc[key])
+        return view
+
+    def slug_index(self, key: str) -> "SlugIndexView":
+        """Return a slug index shaped like data/kjvstudy's ``_SLUG_INDEXES`` entries."""
+        return SlugIndexView(self.category(key))
+
+
+class CategoryView(Mapping):
+    """{subcategory: items} for one category; items decode on access."""
+
+    def __init__(self, store: SharedResourceStore, entries: list):
+        self._store = store
+        self._entries = {entry[0]: entry for entry in entries}
+        self._views = {}
+
+    def __getitem__(self, sub_name):
+        entry = self._entries[sub_name]
+        if entry[1] == "value":
+            return self._store._decode(entry[2], entry[3])
+        view = self._views.get(sub_name)
+        if view is None:
+            view = self._views[sub_name] = ItemsView(self._store, entry[2])
+        return view
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def iter_slugs(self):
+        """Yield (slug, subcategory, item name, offset, length) without decoding items."""
+        for sub_name, kind, *rest in self._entries.values():
+            if kind == "items":
+                for item_name, slug, offset, length in rest[0]:
+                    yield slug, sub_name, item_name, offset, length
+
+
+class ItemsView(Mapping):
+    """{item name: item data} for one subcategory; each access decodes a fresh copy."""
+
+    def __init__(self, store: SharedResourceStore, items: list):
+        self._store = store
+        self._items = {name: (offset, length) for name, _, offset, length in items}
+
+    def __getitem__(self, item_name):
+        return self._store._decode(*self._items[item_name])
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class SlugIndexView(Mapping):
+    """slug -> (item_data, item_name, category_name, category view), decoded on access."""
+
+    def __init__(self, category: CategoryView):
+        self._category = category
+        # Later items win, matching _build_slug_index
+        self._slugs = {slug: (sub_name, item_name, offset, length)
+                       for slug, sub_name, item_name, offset, length in category.iter_slugs()}
+
+    def __getitem__(self, slug):
+        sub_name, item_name, offset, length = self._slugs[slug]
+        return self._category._store._decode(offset, length), item_name, sub_name, self._category
+
+    def __iter__(self):
+        return iter(self._slugs)
+
+    def __len__(self):
+        return len(self._slugs)
@@ -0,0 +1,220 @@
+"""Inverted index from Strong's numbers to every verse (and word) they occur in.
+
+``scripts/build-strongs-index.py`` streams ``interlinear/*.json`` once and
+writes ``strongs.index``: for each Strong's number, the sorted packed ids of
+the verses it occurs in and, per verse, the word positions. The file is a set
+of flat little-endian arrays in compressed-sparse-row form, so opening it maps
+it read-only and a lookup is a binary search over the key array plus a slice.
+
+    from data.kjvstudy.strongs_index import get_verses, get_references
+
+    get_verses("H430")        # memoryview of packed verse ids
+    get_references("G26")     # [("Matthew", 24, 12), ...]
+
+Verse ids are ``references`` ids, so they join directly with other datasets.
+"""
+
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from .references import MAX_CHAPTER, MAX_VERSE, pack as pack_verse
+
+MAGIC = b"KJVSTRG1"
+# magic, key count, verse entry count, position count, header length
+_PREAMBLE = struct.Struct("<8sIIII")
+
+INDEX_PATH = Path(__file__).resolve().parent / "strongs.index"
+
+# Key codes keep Hebrew before Greek and sort numerically within each
+_LANGUAGES = "HG"
+
+
+def encode_number(number: str) -> int:
+    """Encode a Strong's number (``"H430"``, ``"G26"``) as a sortable uint32."""
+    return _LANGUAGES.index(number[0].upper()) << 24 | int(number[1:])
+
+
+def decode_number(code: int) -> str:
+    return f"{_LANGUAGES[code >> 24]}{code & 0xFFFFFF}"
+
+
+def _layout(key_count, entry_count, position_count):
+    """Byte offsets of each array; uint32 arrays first so every one stays 4-byte aligned."""
+    offsets = {}
+    pos = _PREAMBLE.size + (-_PREAMBLE.size % 4)
+    for name, count, size in (("keys", key_count, 4), ("key_offsets", key_count + 1, 4),
+                              ("verses", entry_count, 4), ("entry_offsets", entry_count + 1, 4),
+                              ("positions", position_count, 2)):
+        offsets[name] = (pos, pos + count * size)
+        pos += count * size
+    return offsets, pos
+
+
+def _le_array(typecode: str, values=()) -> array:
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def write_strongs_index(path, postings: dict, books: list, meta=None) -> int:
+    """Write an index file from {Strong's number: iterable of (verse id, position)}.
+
+    Returns the number of keys written. The file is replaced atomically.
+    """
+    keys, key_offsets = array("I"), array("I", [0])
+    verses, entry_offsets = array("I"), array("I", [0])
+    positions = array("H")
+    for code, number in sorted((encode_number(n), n) for n in postings):
+        last_verse = None
+        for verse_id, position in sorted(set(postings[number])):
+            if verse_id != last_verse:
+                if last_verse is not None:
+                    entry_offsets.append(len(positions))
+                verses.append(verse_id)
+                last_verse = verse_id
+            positions.append(position)
+        if last_verse is not None:
+            entry_offsets.append(len(positions))
+        keys.append(code)
+        key_offsets.append(len(verses))
+
+    header = json.dumps(dict(meta or {}, books=list(books)), ensure_ascii=False).encode("utf-8")
+    tmp_path = Path(str(path) + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, len(keys), len(verses), len(positions), len(header)))
+        f.write(b"\0" * (-_PREAMBLE.size % 4))
+        for arr in (keys, key_offsets, verses, entry_offsets):
+            f.write(_le_array("I", arr).tobytes())
+        f.write(_le_array("H", positions).tobytes())
+        f.write(header)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+class StrongsIndex:
+    """Memory-mapped reader over a file written by ``write_strongs_index``."""
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, key_count, entry_count, position_count, header_len = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a Strong's index")
+        layout, header_offset = _layout(key_count, entry_count, position_count)
+        header = json.loads(self._mm[header_offset:header_offset + header_len])
+        self.books = header.pop("books")
+        self.meta = header
+        self._book_numbers = {name: num for num, name in enumerate(self.books)}
+        self._view = None
+        if sys.byteorder == "little":
+            self._view = view = memoryview(self._mm)
+            arrays = {name: view[start:stop].cast("H" if name == "positions" else "I")
+                      for name, (start, stop) in layout.items()}
+        else:
+            arrays = {name: _le_array("H" if name == "positions" else "I", self._mm[start:stop])
+                      for name, (start, stop) in layout.items()}
+        self._keys = arrays["keys"]
+        self._key_offsets = arrays["key_offsets"]
+        self._verses = arrays["verses"]
+        self._entry_offsets = arrays["entry_offsets"]
+        self._positions = arrays["positions"]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, number):
+        return self._slot(number) is not None
+
+    def _slot(self, number: str):
+        try:
+            code = encode_number(number)
+        except (ValueError, IndexError):
+            return None
+        slot = bisect_left(self._keys, code)
+        if slot < len(self._keys) and self._keys[slot] == code:
+            return slot
+        return None
+
+    def _range(self, number: str):
+        slot = self._slot(number)
+        if slot is None:
+            return 0, 0
+        return self._key_offsets[slot], self._key_offsets[slot + 1]
+
+    def numbers(self):
+        """Yield every indexed Strong's number in key order (Hebrew, then Greek)."""
+        for code in self._keys:
+            yield decode_number(code)
+
+    def verses(self, number: str):
+        """Sorted packed ids of the verses a Strong's number occurs in (a zero-copy view)."""
+        start, stop = self._range(number)
+        return self._verses[start:stop]
+
+    def count(self, number: str) -> int:
+        """Number of word occurrences, counting repeats within a verse."""
+        start, stop = self._range(number)
+        return self._entry_offsets[stop] - self._entry_offsets[start]
+
+    def occurrences(self, number: str):
+        """Yield (verse id, word positions) for every verse a Strong's number occurs in."""
+        start, stop = self._range(number)
+        for entry in range(start, stop):
+            yield self._verses[entry], tuple(self._positions[self._entry_offsets[entry]:self._entry_offsets[entry + 1]])
+
+    def verses_any(self, numbers) -> list:
+        """Sorted, de-duplicated verse ids where any of ``numbers`` occurs (e.g. a concept's Strong's list)."""
+        merged = []
+        for verse_id in heapq.merge(*(self.verses(number) for number in numbers)):
+            if not merged or merged[-1] != verse_id:
+                merged.append(verse_id)
+        return merged
+
+    def verse_id(self, book: str, chapter: int, verse: int):
+        """Packed id for a (book name, chapter, verse), or None for a book not in this index or a chapter or verse out of range."""
+        book_num = self._book_numbers.get(book)
+        if book_num is None or not (1 <= chapter <= MAX_CHAPTER and 1 <= verse <= MAX_VERSE):
+            return None
+        return pack_verse(book_num, chapter, verse)
+
+    def reference(self, verse_id: int):
+        """(book name, chapter, verse) for a packed verse id."""
+        return self.books[verse_id >> 16], verse_id >> 8 & 0xFF, verse_id & 0xFF
+
+    def close(self):
+        if self._view is not None:
+            for arr in (self._keys, self._key_offsets, self._verses, self._entry_offsets, self._positions):
+                arr.release()
+            self._view.release()
+        self._mm.close()
+
+
+_INDEX = None
+
+
+def open_index() -> StrongsIndex:
+    """Return the (cached) index at ``INDEX_PATH``."""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = StrongsIndex(INDEX_PATH)
+    return _INDEX
+
+
+def get_verses(number: str):
+    """Packed verse ids for a Strong's number from the default index."""
+    return open_index().verses(number)
+
+
+def get_references(number: str) -> list:
+    """[(book name, chapter, verse), ...] for a Strong's number from the default index."""
+    index = open_index()
+    return [index.reference(verse_id) for verse_id in index.verses(number)]
@@ -0,0 +1,248 @@
+"""Random access to single entries of the Strong's lexicons.
+
+``strongs/hebrew.json`` and ``strongs/greek.json`` hold one entry per line
+(``"H1":{...},``). The first time a lexicon is opened, it is scanned once and
+the byte range of every entry is written to ``strongs/<language>.offsets``.
+After that, a lookup is a binary search over the cached offsets plus a
+``json.loads`` of that one line's value, so a word-study page that needs a
+handful of entries never parses the other 14,000.
+
+    from data.kjvstudy.strongs_lexicon import get_entry, get_entries
+
+    get_entry("H430")                  # {"lemma": "אֱלֹהִים", "kjv_def": ..., ...}
+    get_entries(["G26", "H2617", "G5485"])  # {"G26": {...}, "H2617": {...}, ...}
+
+Numbers are matched numerically, so ``"H0430"`` and ``"h430"`` find H430.
+The offsets file is rebuilt automatically when the lexicon changes; it is
+checked by size and mtime first, then by content hash.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from pathlib import Path
+
+from .strongs_index import decode_number, encode_number
+
+MAGIC = b"KJVLEXO1"
+# magic, entry count, source size, source mtime (ns), source sha256
+_PREAMBLE = struct.Struct("<8sIQq32s")
+
+STRONGS_DIR = Path(__file__).resolve().parent / "strongs"
+LEXICON_FILES = {"H": "hebrew.json", "G": "greek.json"}
+
+_decoder = json.JSONDecoder()
+
+
+def _le_array(typecode: str, values=()) -> array:
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _source_hash(data) -> bytes:
+    return hashlib.sha256(data).digest()
+
+
+def scan_offsets(data: bytes):
+    """(codes, starts, ends) of every entry's JSON value in a one-entry-per-line lexicon, sorted by code.
+
+    Each value is decoded once to find exactly where it ends, so a file not in
+    the expected layout raises ValueError instead of producing bad offsets.
+    """
+    entries = []
+    line_start = 0
+    while line_start < len(data):
+        line_end = data.find(b"\n", line_start)
+        if line_end == -1:
+            line_end = len(data)
+        line = data[line_start:line_end]
+        key_start = line.find(b'"')
+        if key_start != -1:
+            key_end = line.index(b'"', key_start + 1)
+            value_start = line.index(b":", key_end) + 1
+            text = line.decode("utf-8")
+            char_start = len(line[:value_start].decode("utf-8"))
+            value, char_end = _decoder.raw_decode(text, char_start)
+            if not isinstance(value, dict):
+                raise ValueError(f"lexicon entry is not an object at byte {line_start}")
+            start = line_start + value_start
+            end = line_start + len(text[:char_end].encode("utf-8"))
+            entries.append((encode_number(line[key_start + 1:key_end].decode("ascii")), start, end))
+        line_start = line_end + 1
+    entries.sort()
+    return (array("I", (code for code, _, _ in entries)),
+            array("I", (start for _, start, _ in entries)),
+            array("I", (end for _, _, end in entries)))
+
+
+def write_offsets(path, source_path, data: bytes = None):
+    """Scan ``source_path`` and write its offsets file atomically. Returns (codes, starts, ends)."""
+    if data is None:
+        data = Path(source_path).read_bytes()
+    st = os.stat(source_path)
+    arrays = scan_offsets(data)
+    tmp_path = Path(str(path) + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, len(arrays[0]), st.st_size, st.st_mtime_ns, _source_hash(data)))
+        for arr in arrays:
+            f.write(_le_array("I", arr).tobytes())
+    os.replace(tmp_path, path)
+    return arrays
+
+
+def _read_offsets(path, source_path, source):
+    """The cached (codes, starts, ends) if they were built from this exact source, else None."""
+    try:
+        raw = Path(path).read_bytes()
+        magic, count, size, mtime_ns, digest = _PREAMBLE.unpack_from(raw, 0)
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC or len(raw) != _PREAMBLE.size + 12 * count:
+        return None
+    st = os.stat(source_path)
+    # Unchanged stats skip the hash; touched files fall back to comparing content
+    if (size, mtime_ns) != (st.st_size, st.st_mtime_ns) and digest != _source_hash(source):
+        return None
+    arrays = []
+    for i in range(3):
+        start = _PREAMBLE.size + 4 * count * i
+        arrays.append(_le_array("I", raw[start:start + 4 * count]))
+    return tuple(arrays)
+
+
+class StrongsLexicon:
+    """One lexicon file, memory-mapped, with entries decoded on demand through an LRU."""
+
+    def __init__(self, path, offsets_path=None, cache_size=512):
+        self.path = Path(path)
+        self.offsets_path = Path(offsets_path) if offsets_path else self.path.with_suffix(".offsets")
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        arrays = _read_offsets(self.offsets_path, self.path, self._mm)
+        if arrays is None:
+            try:
+                arrays = write_offsets(self.offsets_path, self.path, self._mm[:])
+            except OSError:
+                # Read-only checkout: keep the offsets in memory only
+                arrays = scan_offsets(self._mm[:])
+        self._codes, self._starts, self._ends = arrays
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __contains__(self, number):
+        return self._slot(number) is not None
+
+    def _slot(self, number):
+        try:
+            code = encode_number(number)
+        except (ValueError, IndexError):
+            return None
+        slot = bisect_left(self._codes, code)
+        if slot < len(self._codes) and self._codes[slot] == code:
+            return slot
+        return None
+
+    def _cached(self, slot):
+        entry = self._cache.get(slot)
+        if entry is not None:
+            self._cache.move_to_end(slot)
+        return entry
+
+    def _remember(self, slot, entry):
+        self._cache[slot] = entry
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _decode(self, slot) -> dict:
+        return json.loads(self._mm[self._starts[slot]:self._ends[slot]])
+
+    def get(self, number: str, default=None):
+        """The entry for a Strong's number, or ``default``.
+
+        Entries are shared with the cache; copy one before changing it.
+        """
+        slot = self._slot(number)
+        if slot is None:
+            return default
+        entry = self._cached(slot)
+        if entry is None:
+            entry = self._decode(slot)
+            self._remember(slot, entry)
+        return entry
+
+    def get_many(self, numbers) -> dict:
+        """{number: entry} for every number found, keyed as given.
+
+        Entries not in the cache are decoded in file order, so a batch is one
+        forward pass over the mapped file.
+        """
+        result = {}
+        missing = []
+        for number in numbers:
+            slot = self._slot(number)
+            if slot is None:
+                continue
+            entry = self._cached(slot)
+            if entry is None:
+                missing.append((self._starts[slot], slot, number))
+            else:
+                result[number] = entry
+        decoded = {}
+        for _, slot, number in sorted(missing):
+            entry = decoded.get(slot)
+            if entry is None:
+                entry = decoded[slot] = self._decode(slot)
+                self._remember(slot, entry)
+            result[number] = entry
+        return result
+
+    def numbers(self):
+        """Every Strong's number in the lexicon, in numeric order."""
+        for code in self._codes:
+            yield decode_number(code)
+
+    def close(self):
+        self._cache.clear()
+        self._mm.close()
+
+
+_LEXICONS = {}
+
+
+def open_lexicon(language: str) -> StrongsLexicon:
+    """Return the (cached) Hebrew ("H") or Greek ("G") lexicon."""
+    language = language[:1].upper()
+    lexicon = _LEXICONS.get(language)
+    if lexicon is None:
+        lexicon = _LEXICONS[language] = StrongsLexicon(STRONGS_DIR / LEXICON_FILES[language])
+    return lexicon
+
+
+def get_entry(number: str, default=None):
+    """The lexicon entry for ``"H430"``, ``"G26"``, ..., or ``default``."""
+    if not number or number[0].upper() not in LEXICON_FILES:
+        return default
+    return open_lexicon(number[0]).get(number, default)
+
+
+def get_entries(numbers) -> dict:
+    """{number: entry} for every number found, across both lexicons."""
+    by_language = {}
+    for number in numbers:
+        if number and number[0].upper() in LEXICON_FILES:
+            by_language.setdefault(number[0].upper(), []).append(number)
+    result = {}
+    for language, language_numbers in by_language.items():
+        result.update(open_lexicon(language).get_many(language_numbers))
+    return {number: result[number] for number in numbers if number in result}
@@ -0,0 +1,348 @@
+"""Read SWORD compressed commentary modules (zCom, zCom4) directly.
+
+A module holds, per testament, three files: ``.bzs`` (block index: offset,
+size and uncompressed size of each zlib block), ``.bzv`` (verse index: block
+number, offset and size of each verse within its decompressed block) and
+``.bzz`` (the compressed blocks). ``SwordCommentary`` maps all three read-only,
+finds a verse's entry by its SWORD slot, decompresses its block through a
+bounded LRU, and converts the OSIS markup to text only for the verse asked
+for. A service can answer per-verse lookups straight from the few-MB module
+files, with no converted JSON held in memory.
+
+    from data.kjvstudy.sword import SwordCommentary
+
+    with SwordCommentary("data/sword-modules/MHC", "zCom4") as mhc:
+        mhc.get("John 3:16")          # plain text, or None
+        mhc.get_chapter("John", 3)    # {verse: text}
+
+    get_commentary("Barnes", "romans-8-28")   # shared reader per module in MODULES
+
+Keys are anything ``references.parse`` accepts. Readers are safe to share
+between threads; ``close()`` waits for lookups in progress, and lookups after
+it return None. ``scripts/convert-sword-commentaries.py`` uses the same
+reader to dump whole modules to JSON.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+from .markup import osis_to_text
+from .references import BOOKS, NT_BOOKS, OT_BOOKS, book_number, is_valid, pack, parse, unpack
+
+TESTAMENTS = ("ot", "nt")
+
+SWORD_DIR = Path(__file__).resolve().parent.parent / "sword-modules"
+
+# Commentary name -> (directory under SWORD_DIR, driver)
+MODULES = {
+    "MHC": ("MHC", "zCom4"),
+    "MHCC": ("MHCC", "zCom"),
+    "Barnes": ("Barnes", "zCom"),
+    "Clarke": ("Clarke", "zCom"),
+    "JFB": ("JFB", "zCom4"),
+    "Wesley": ("Wesley", "zCom"),
+    "CalvinCommentaries": ("CalvinCommentaries", "zCom"),
+    "RWP": ("RWP", "zCom"),
+    "KD": ("KD", "zCom4"),
+}
+
+# Verse index entry per driver: block number, offset in block, size
+VERSE_ENTRY = {
+    "zCom4": struct.Struct("<III"),
+    "zCom": struct.Struct("<IIH"),
+}
+# Block index entry: offset in .bzz, compressed size, uncompressed size
+BLOCK_ENTRY = struct.Struct("<III")
+
+# Entries this short are placeholders in the published modules, not commentary
+MIN_TEXT_LENGTH = 11
+
+
+def entry_text(raw: bytes):
+    """Plain text for a verse entry's OSIS bytes, or None if it is too short to be commentary."""
+    text = osis_to_text(raw.decode("utf-8", errors="replace"))
+    return text if len(text) >= MIN_TEXT_LENGTH else None
+
+
+def find_testament_files(module_dir, testament):
+    """Locate a testament's (.bzs, .bzv, .bzz) paths — or .czs/.czv/.czz — under module_dir."""
+    for root, dirs, files in os.walk(module_dir):
+        for ext_prefix in ("b", "c"):
+            if f"{testament}.{ext_prefix}zz" in files:
+                return tuple(os.path.join(root, f"{testament}.{ext_prefix}z{kind}") for kind in "svz")
+    return None
+
+
+def map_file(path):
+    """Memory-map a file read-only. Empty files map to b'' (mmap rejects them)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Versification:
+    """Array-backed map between SWORD verse indexes and (book slug, chapter, verse).
+
+    Mirrors SWORD's KJV layout for one testament file: slot 0 is the module
+    heading, slot 1 the testament heading, then each book has a heading slot
+    followed, per chapter, by a chapter heading slot and its verses. Book
+    headings map to chapter 0 and chapter headings to verse 0.
+    """
+
+    MODULE_HEADING = 0
+    TESTAMENT_HEADING = 1
+
+    def __init__(self, books):
+        """``books`` is a run of ``references.Book`` entries (one testament)."""
+        self.slugs = [book.slug for book in books]
+        self.first_book = books[0].number
+        # Per slot: book number (-1 for module/testament headings), chapter, verse
+        self.book = array("b", [-1, -1])
+        self.chapter = array("H", [0, 0])
+        self.verse = array("H", [0, 0])
+        # Per book: slot of each chapter heading, so verse v of chapter c is chapter_slots[c - 1] + v
+        self.chapter_slots = []
+        self.key_to_index = {}
+
+        for book_num, book in enumerate(books):
+            slug = self.slugs[book_num]
+            self._append(book_num, 0, 0)
+            slots = []
+            for ch_num, verse_count in enumerate(book.verses, 1):
+                slots.append(len(self.book))
+                self._append(book_num, ch_num, 0)
+                for verse_num in range(1, verse_count + 1):
+                    self.key_to_index[f"{slug}-{ch_num}-{verse_num}"] = len(self.book)
+                    self._append(book_num, ch_num, verse_num)
+            self.chapter_slots.append(slots)
+
+    def _append(self, book_num, chapter, verse):
+        self.book.append(book_num)
+        self.chapter.append(chapter)
+        self.verse.append(verse)
+
+    def __len__(self):
+        return len(self.book)
+
+    def lookup(self, index):
+        """Return (book slug, chapter, verse) for a slot, or None for module/testament headings."""
+        if index < 0 or index >= len(self.book) or self.book[index] < 0:
+            return None
+        return self.slugs[self.book[index]], self.chapter[index], self.verse[index]
+
+    def key(self, index):
+        """Return the book-chapter-verse key for a verse slot, or None for heading slots."""
+        if index < 0 or index >= len(self.book) or self.verse[index] == 0:
+            return None
+        return f"{self.slugs[self.book[index]]}-{self.chapter[index]}-{self.verse[index]}"
+
+    def index(self, key):
+        """Return the slot of a book-chapter-verse key, or None."""
+        return self.key_to_index.get(key)
+
+    def slot(self, verse_id: int) -> int:
+        """Slot of a packed ``references`` verse id in this testament (the id must be valid here)."""
+        book, chapter, verse = unpack(verse_id)
+        return self.chapter_slots[book - self.first_book][chapter - 1] + verse
+
+
+_VERSIFICATIONS = {}
+
+
+def get_versification(testament):
+    """Return the (cached) Versification for 'ot' or 'nt'."""
+    v11n = _VERSIFICATIONS.get(testament)
+    if v11n is None:
+        v11n = _VERSIFICATIONS[testament] = Versification(OT_BOOKS if testament == "ot" else NT_BOOKS)
+    return v11n
+
+
+def verse_index_to_key(verse_index, testament):
+    """Convert a SWORD verse index to a book-chapter-verse key (None for heading slots)."""
+    return get_versification(testament).key(verse_index)
+
+
+class _Testament:
+    """One testament's mapped .bzs/.bzv/.bzz files."""
+
+    def __init__(self, paths, verse_entry):
+        self.blocks, self.verses, self.data = [map_file(path) for path in paths]
+        self.verse_entry = verse_entry
+        self.block_count = len(self.blocks) // BLOCK_ENTRY.size
+        self.verse_count = len(self.verses) // verse_entry.size
+
+    def entry(self, verse_index):
+        """(block number, offset, size) of a slot, or None if it has no text or points past the blocks."""
+        if verse_index >= self.verse_count:
+            return None
+        block_num, offset, size = self.verse_entry.unpack_from(self.verses, verse_index * self.verse_entry.size)
+        if size == 0 or block_num >= self.block_count:
+            return None
+        return block_num, offset, size
+
+    def decompress(self, block_num):
+        """A block's decompressed bytes, or None if it is empty or corrupt."""
+        block_offset, block_size, _ = BLOCK_ENTRY.unpack_from(self.blocks, block_num * BLOCK_ENTRY.size)
+        if block_size == 0:
+            return None
+        try:
+            return zlib.decompress(self.data[block_offset:block_offset + block_size])
+        except zlib.error:
+            return None
+
+    def close(self):
+        for m in (self.blocks, self.verses, self.data):
+            if isinstance(m, mmap.mmap):
+                m.close()
+
+
+class SwordCommentary:
+    """Long-lived, thread-safe reader over one zCom/zCom4 commentary module.
+
+    Only ``cache_blocks`` decompressed blocks are kept (least recently used
+    dropped first). Texts are not cached: each lookup slices its block and
+    converts the markup, so memory is bounded by the block cache.
+    """
+
+    def __init__(self, module_dir, mod_drv="zCom", cache_blocks=64, testaments=TESTAMENTS):
+        if mod_drv not in VERSE_ENTRY:
+            raise ValueError(f"unsupported SWORD driver: {mod_drv}")
+        self.module_dir = module_dir
+        self.mod_drv = mod_drv
+        self.testaments = {}
+        for testament in testaments:
+            paths = find_testament_files(module_dir, testament)
+            if paths:
+                self.testaments[testament] = _Testament(paths, VERSE_ENTRY[mod_drv])
+        self._cache = OrderedDict()
+        self._cache_blocks = cache_blocks
+        self._lock = threading.Lock()
+        # Reads in progress; close() waits for them before unmapping the files
+        self._readers = 0
+        self._idle = threading.Condition(self._lock)
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _block(self, testament, block_num):
+        """A decompressed block through the LRU. Decompression runs outside the lock."""
+        cache_key = (testament, block_num)
+        with self._lock:
+            block = self._cache.get(cache_key)
+            if block is not None:
+                self._cache.move_to_end(cache_key)
+                return block
+        block = self.testaments[testament].decompress(block_num)
+        if block is not None and self._cache_blocks > 0:
+            with self._lock:
+                self._cache[cache_key] = block
+                self._cache.move_to_end(cache_key)
+                while len(self._cache) > self._cache_blocks:
+                    self._cache.popitem(last=False)
+        return block
+
+    def raw(self, testament, verse_index):
+        """The OSIS bytes stored for a SWORD slot, or None (always None once closed)."""
+        with self._lock:
+            if self._closed:
+                return None
+            self._readers += 1
+        try:
+            files = self.testaments.get(testament)
+            entry = files.entry(verse_index) if files else None
+            if entry is None:
+                return None
+            block_num, offset, size = entry
+            block = self._block(testament, block_num)
+            if block is None or offset + size > len(block):
+                return None
+            return block[offset:offset + size]
+        finally:
+            with self._lock:
+                self._readers -= 1
+                if not self._readers:
+                    self._idle.notify_all()
+
+    def _locate(self, verse_id):
+        testament = "ot" if verse_id >> 16 < len(OT_BOOKS) else "nt"
+        return testament, get_versification(testament).slot(verse_id)
+
+    def get(self, reference):
+        """Plain-text commentary on a verse (id or any reference form), or None."""
+        try:
+            verse_id = parse(reference) if isinstance(reference, str) else reference
+        except ValueError:
+            return None
+        if not is_valid(verse_id):
+            return None
+        raw = self.raw(*self._locate(verse_id))
+        return entry_text(raw) if raw is not None else None
+
+    def get_chapter(self, book, chapter: int) -> dict:
+        """{verse: text} for the verses of a chapter that have commentary ({} for an unknown book or chapter)."""
+        result = {}
+        try:
+            number = book_number(book) if isinstance(book, str) else book
+        except KeyError:
+            return result
+        if not 0 <= number < len(BOOKS):
+            return result
+        book = BOOKS[number]
+        if not 1 <= chapter <= len(book.verses):
+            return result
+        for verse in range(1, book.verses[chapter - 1] + 1):
+            text = self.get(pack(book.number, chapter, verse))
+            if text is not None:
+                result[verse] = text
+        return result
+
+    def iter_texts(self):
+        """Yield (testament, verse_index, text) for every verse with commentary, in index order."""
+        for testament, files in self.testaments.items():
+            for verse_index in range(files.verse_count):
+                raw = self.raw(testament, verse_index)
+                if raw is None:
+                    continue
+                text = entry_text(raw)
+                if text is not None:
+                    yield testament, verse_index, text
+
+    def close(self):
+        """Unmap the module files once reads in progress finish; later lookups return None."""
+        with self._lock:
+            self._closed = True
+            while self._readers:
+                self._idle.wait()
+            self._cache.clear()
+            for files in self.testaments.values():
+                files.close()
+            self.testaments = {}
+
+
+_COMMENTARIES = {}
+_COMMENTARIES_LOCK = threading.Lock()
+
+
+def open_commentary(name: str) -> SwordCommentary:
+    """Return the (cached) reader for a module in ``MODULES``, under ``SWORD_DIR``."""
+    with _COMMENTARIES_LOCK:
+        commentary = _COMMENTARIES.get(name)
+        if commentary is None:
+            dir_name, mod_drv = MODULES[name]
+            commentary = _COMMENTARIES[name] = SwordCommentary(SWORD_DIR / dir_name, mod_drv)
+        return commentary
+
+
+def get_commentary(name: str, reference):
+    return open_commentary(name).get(reference)
@@ -0,0 +1,278 @@
+"""
+Minimal asyncio HTTP/1.1 client with persistent keep-alive connections.
+
+Standard library only. Connections are kept open per (scheme, host, port) and
+reused for later requests, so a scrape pays one TCP+TLS handshake per
+connection instead of one per page. ``limit`` caps the number of requests
+(and therefore connections) in flight; pass an AdaptiveLimiter to let that cap
+follow AIMD, and an ``observer`` callable to receive one telemetry dict per
+request.
+
+    async with ConnectionPool(limit=10, headers={'User-Agent': '...'}) as pool:
+        status, headers, body = await pool.get('https://example.com/page')
+"""
+
+import asyncio, random, ssl, time, zlib
+from collections import deque
+from urllib.parse import urljoin, urlsplit
+
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# Responses worth retrying: rate limiting and server-side failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HTTPError(Exception):
+    """Raised for a non-2xx response."""
+
+    def __init__(self, url, status):
+        super().__init__(f"HTTP {status} for {url}")
+        self.url = url
+        self.status = status
+
+
+class AdaptiveLimiter:
+    """Caps requests in flight; with adaptive=True the cap follows AIMD.
+
+    Each success adds 1/limit (about +1 per window of ``limit`` responses).
+    A 429/503, a timeout or connection failure halves it, at most once per
+    window so one burst of bad responses only counts once. So does latency,
+    but only when it has risen with concurrency: the smoothed latency must
+    exceed ``latency_factor`` times the baseline (the lowest smoothed latency
+    among the last ``latency_window`` good responses) while the limit is above
+    the one that baseline was measured at. The baseline follows a server that
+    has become steadily slower, so jitter or a slow spell never pins the limit
+    at ``minimum``, and growth resumes once latency recovers.
+    """
+
+    def __init__(self, limit=10, minimum=1, maximum=64, adaptive=True, latency_factor=3.0, latency_window=500):
+        self.limit = float(limit)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.adaptive = adaptive
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.peak = self.limit
+        self.decreases = 0
+        self._cond = asyncio.Condition()
+        self._ewma = None
+        # (smoothed latency, limit) of recent good responses
+        self._baseline = deque(maxlen=latency_window)
+        self._since_decrease = 0
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def observe(self, latency, status=None, error=None):
+        """Feed one request outcome into the controller."""
+        if not self.adaptive:
+            return
+        self._since_decrease += 1
+        congested = error is not None or status in (429, 503)
+        # Throttled responses come back fast; only real responses set the latency baseline
+        if not congested:
+            self._ewma = latency if self._ewma is None else 0.8 * self._ewma + 0.2 * latency
+            self._baseline.append((self._ewma, self.limit))
+            base_latency, base_limit = min(self._baseline)
+            congested = self._ewma > self.latency_factor * base_latency and self.limit > base_limit
+        if not congested:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.peak = max(self.peak, self.limit)
+        elif self._since_decrease >= self.limit:
+            self.limit = max(self.minimum, self.limit / 2)
+            self._since_decrease = 0
+            self.decreases += 1
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.requests = 0
+
+    def usable(self):
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections shared by concurrent GET requests."""
+
+    def __init__(self, limit=10, timeout=30, headers=None, limiter=None, observer=None):
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.limiter = limiter or AdaptiveLimiter(limit, adaptive=False)
+        self.observer = observer
+        self._idle = {}
+        self._ssl = ssl.create_default_context()
+        # Counters for progress output and checking that connections are reused
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+
+    async def _connect(self, origin):
+        scheme, host, port = origin
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=self._ssl if scheme == 'https' else None,
+            server_hostname=host if scheme == 'https' else None)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    def _checkout(self, origin):
+        conns = self._idle.get(origin)
+        while conns:
+            conn = conns.pop()
+            if conn.usable():
+                return conn
+            conn.close()
+        return None
+
+    async def get(self, url, attempt=0):
+        """GET a URL, following redirects. Returns (status, headers, body bytes).
+
+        Raises HTTPError for non-2xx responses.
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            async with self.limiter:
+                started = time.perf_counter()
+                try:
+                    status, headers, body = await asyncio.wait_for(self._request(url), self.timeout)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                    self._observe(url, attempt, started, error=e)
+                    raise
+                self._observe(url, attempt, started, status, len(body))
+            if status in REDIRECT_STATUSES and 'location' in headers:
+                url = urljoin(url, headers['location'])
+                continue
+            if not 200 <= status < 300:
+                raise HTTPError(url, status)
+            return status, headers, body
+        raise HTTPError(url, status)
+
+    async def get_with_retry(self, url, retries=3, backoff=1.0):
+        """GET a URL, retrying connection failures, timeouts and 429/5xx responses.
+
+        Waits backoff * 2**attempt seconds (with jitter) between attempts and
+        re-raises the last error once ``retries`` retries are used up.
+        """
+        for attempt in range(retries + 1):
+            try:
+                return await self.get(url, attempt)
+            except HTTPError as e:
+                if e.status not in RETRY_STATUSES or attempt == retries:
+                    raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                if attempt == retries:
+                    raise
+            await asyncio.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    def _observe(self, url, attempt, started, status=None, size=0, error=None):
+        latency = time.perf_counter() - started
+        self.limiter.observe(latency, status, error)
+        if self.observer:
+            self.observer({
+                'url': url, 'status': status, 'bytes': size, 'latency_ms': round(latency * 1000, 2),
+                'attempt': attempt, 'limit': round(self.limiter.limit, 2),
+                'error': f"{type(error).__name__}: {error}" if error else None,
+            })
+
+    async def _request(self, url):
+        parts = urlsplit(url)
+        scheme = parts.scheme or 'http'
+        port = parts.port or (443 if scheme == 'https' else 80)
+        origin = (scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        lines = [f"GET {path} HTTP/1.1", f"Host: {parts.netloc}",
+                 'Accept-Encoding: gzip', 'Connection: keep-alive']
+        lines += [f"{name}: {value}" for name, value in self.headers.items()]
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        conn = self._checkout(origin)
+        if conn is not None:
+            # The server may have dropped an idle connection; retry once on a fresh one
+            try:
+                return await self._exchange(origin, conn, request)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                conn.close()
+        return await self._exchange(origin, await self._connect(origin), request)
+
+    async def _exchange(self, origin, conn, request):
+        try:
+            conn.writer.write(request)
+            await conn.writer.drain()
+            conn.requests += 1
+            self.requests_sent += 1
+            status, headers, body, keep_alive = await _read_response(conn.reader)
+        except BaseException:
+            conn.close()
+            raise
+        if keep_alive:
+            self._idle.setdefault(origin, []).append(conn)
+        else:
+            conn.close()
+        return status, headers, body
+
+
+async def _read_response(reader):
+    """Read one response. Returns (status, headers, body, keep_alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise asyncio.IncompleteReadError(b'', None)
+    version, status = status_line.decode('latin-1').split(None, 2)[:2]
+    status = int(status)
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+    if status in (204, 304) or 100 <= status < 200:
+        body = b''
+    elif headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                # Trailers end with a blank line
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    else:
+        body = await reader.read()
+        keep_alive = False
+
+    if headers.get('content-encoding', '').lower() == 'gzip':
+        body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    return status, headers, body, keep_alive
@@ -0,0 +1,134 @@
+"""
+Streaming, atomic writers for {book-chapter-verse key: text} outputs.
+
+EntryWriter writes entries in the order given, either as one JSON object
+(byte-identical to json.dump(dict(entries), ensure_ascii=False)) or as NDJSON,
+one {"key": ..., "text": ...} object per line. Output goes to a temp file that
+replaces the target only when the writer closes cleanly.
+
+ChapterOrderedWriter takes whole chapters in any order and writes each one as
+soon as every chapter before it in the canonical order has been written, so
+only chapters that arrive early are held in memory and the output does not
+depend on completion order.
+"""
+
+import json, os
+
+
+def verse_number(entry):
+    """Sort key for a (book-chapter-verse key, text) entry."""
+    return int(entry[0].rsplit('-', 1)[1])
+
+
+class EntryWriter:
+    """Write (key, text) entries as a JSON object or NDJSON, atomically."""
+
+    def __init__(self, path, ndjson=False, atomic=True):
+        self.path = path
+        self.ndjson = ndjson
+        self.count = 0
+        self._tmp_path = path + '.tmp' if atomic else path
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        if not ndjson:
+            self._file.write('{')
+
+    def write(self, key, text):
+        f = self._file
+        if self.ndjson:
+            f.write(json.dumps({'key': key, 'text': text}, ensure_ascii=False))
+            f.write('\n')
+        else:
+            if self.count:
+                f.write(', ')
+            f.write(json.dumps(key, ensure_ascii=False))
+            f.write(': ')
+            f.write(json.dumps(text, ensure_ascii=False))
+        self.count += 1
+
+    def close(self):
+        if not self.ndjson:
+            self._file.write('}')
+        self._file.close()
+        if self._tmp_path != self.path:
+            os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Close without replacing the target."""
+        self._file.close()
+        if self._tmp_path != self.path:
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ChapterOrderedWriter(EntryWriter):
+    """EntryWriter fed whole chapters, in any order, that writes them in canonical order.
+
+    ``chapters`` lists every chapter id in canonical order. Entries within a
+    chapter are de-duplicated (last wins) and sorted by verse.
+    """
+
+    def __init__(self, path, chapters, ndjson=False, atomic=True):
+        super().__init__(path, ndjson, atomic)
+        self._order = list(chapters)
+        self._position = {chapter: i for i, chapter in enumerate(self._order)}
+        self._next = 0
+        self._pending = {}
+        # Chapters held in memory (callables waiting to be loaded don't count)
+        self._buffered = 0
+        self.peak_buffered = 0
+
+    def ahead(self, chapter):
+        """How many chapters ``chapter`` is ahead of the next one to be written.
+
+        Producers that only start chapters less than a fixed window ahead keep
+        the reorder buffer bounded by that window.
+        """
+        return self._position[chapter] - self._next
+
+    def add_chapter(self, chapter, entries):
+        """Queue a chapter's entries and write every chapter that is now next in line.
+
+        ``entries`` may be a list of (key, text) or a callable returning one;
+        a callable is only invoked when the chapter is written, so chapters
+        already on disk (e.g. from a resumed run) cost nothing while they wait.
+        Report failed chapters with [] so later chapters are not held back.
+        Returns the ids of the chapters written, in order.
+        """
+        self._pending[chapter] = entries
+        if not callable(entries):
+            self._buffered += 1
+            self.peak_buffered = max(self.peak_buffered, self._buffered)
+        return self._flush()
+
+    def _write_chapter(self, entries):
+        if callable(entries):
+            entries = entries()
+        else:
+            self._buffered -= 1
+        for key, text in sorted(dict(entries).items(), key=verse_number):
+            self.write(key, text)
+
+    def _flush(self):
+        written = []
+        while self._next < len(self._order) and self._order[self._next] in self._pending:
+            chapter = self._order[self._next]
+            self._write_chapter(self._pending.pop(chapter))
+            self._next += 1
+            written.append(chapter)
+        return written
+
+    def close(self):
+        # Chapters that never arrived are left out; write whatever follows them
+        for chapter in self._order[self._next:]:
+            if chapter in self._pending:
+                self._write_chapter(self._pending.pop(chapter))
+        self._next = len(self._order)
+        super().close()
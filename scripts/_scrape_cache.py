@@ -0,0 +1,95 @@
+"""
+On-disk cache and checkpoint journal for commentary scrapers.
+
+Layout under the cache root:
+  pages/<aa>/<sha256>.html.gz   raw response bodies, content-addressed
+  journal.jsonl                 one record per finished chapter attempt
+
+Journal records are appended (and flushed) as chapters complete, so a killed
+run loses at most the chapter in flight. The last record for a chapter wins;
+a torn final line from a crash is ignored.
+"""
+
+import gzip, hashlib, json, os
+
+
+class ScrapeCache:
+    """Content-addressed page store plus an append-only chapter journal."""
+
+    def __init__(self, root):
+        self.root = root
+        self.pages_dir = os.path.join(root, 'pages')
+        self.journal_path = os.path.join(root, 'journal.jsonl')
+        os.makedirs(self.pages_dir, exist_ok=True)
+        self._journal = None
+
+    def page_path(self, sha):
+        return os.path.join(self.pages_dir, sha[:2], f'{sha}.html.gz')
+
+    def put_page(self, body):
+        """Store a raw page body. Returns its sha256."""
+        sha = hashlib.sha256(body).hexdigest()
+        path = self.page_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(body))
+            os.replace(tmp_path, path)
+        return sha
+
+    def get_page(self, sha):
+        with open(self.page_path(sha), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def journal_index(self):
+        """Return {chapter id: (offset, status)} for the last record of each chapter.
+
+        Only offsets are kept, so resuming never holds a whole commentary in memory.
+        """
+        index = {}
+        try:
+            with open(self.journal_path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None
+                    if record is not None:
+                        index[record['id']] = (offset, record['status'])
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        return index
+
+    def read_record(self, offset):
+        with open(self.journal_path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def reset_journal(self):
+        self.close()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def record(self, chapter_id, status, **fields):
+        """Append a chapter record ('ok' or 'error') to the journal."""
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(dict(fields, id=chapter_id, status=status), ensure_ascii=False) + '\n')
+        self._journal.flush()
+
+    def rewrite_journal(self, records):
+        """Atomically replace the journal with the given records (an iterable, consumed lazily)."""
+        self.close()
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.journal_path)
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
@@ -0,0 +1,106 @@
+"""
+Per-request telemetry for commentary scrapers.
+
+RequestLog is a ConnectionPool observer: it appends one JSON line per HTTP
+request (url, status, bytes, latency, retry attempt, concurrency limit,
+error) to a log file and keeps the counters needed for the end-of-run
+summary, including a log2 latency histogram. StageCounter tracks throughput
+and backpressure for one stage of the fetch/parse pipeline.
+"""
+
+import json, time
+from collections import Counter
+
+# Histogram bucket upper bounds in ms: <8, <16, ... <8192, then everything slower
+BUCKETS_MS = [8 << i for i in range(11)]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class RequestLog:
+    """Collect request telemetry and write it as JSONL."""
+
+    def __init__(self, path=None):
+        self.started = time.perf_counter()
+        self._file = open(path, 'w', encoding='utf-8') if path else None
+        self.latencies = []
+        self.statuses = Counter()
+        self.bytes = 0
+        self.retries = 0
+        self.errors = 0
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+
+    def __call__(self, event):
+        event['t'] = round(time.perf_counter() - self.started, 3)
+        if self._file:
+            self._file.write(json.dumps(event) + '\n')
+        latency = event['latency_ms']
+        self.latencies.append(latency)
+        self.histogram[next((i for i, bound in enumerate(BUCKETS_MS) if latency < bound), len(BUCKETS_MS))] += 1
+        self.statuses[event['status'] or 'error'] += 1
+        self.bytes += event['bytes']
+        if event['attempt']:
+            self.retries += 1
+        if event['error']:
+            self.errors += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def summary(self, limiter=None):
+        """Return the end-of-run report as a list of lines."""
+        elapsed = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        requests = len(latencies)
+        lines = [
+            f"Requests: {requests} in {elapsed:.1f}s ({requests / elapsed if elapsed else 0:.1f}/s), "
+            f"{self.bytes / 1024 / 1024:.1f} MB ({self.bytes / 1024 / 1024 / elapsed if elapsed else 0:.2f} MB/s)",
+            f"Statuses: {', '.join(f'{status}={count}' for status, count in sorted(self.statuses.items(), key=str))}",
+            f"Retries: {self.retries}, connection errors/timeouts: {self.errors}",
+            f"Latency ms: p50 {percentile(latencies, 0.5):.1f}  p90 {percentile(latencies, 0.9):.1f}  "
+            f"p99 {percentile(latencies, 0.99):.1f}  max {latencies[-1] if latencies else 0:.1f}",
+        ]
+        if limiter is not None and limiter.adaptive:
+            lines.append(f"Concurrency: final {limiter.limit:.1f}, peak {limiter.peak:.1f}, "
+                         f"{limiter.decreases} backoffs")
+        peak = max(self.histogram) or 1
+        lower = 0
+        for bound, count in zip(BUCKETS_MS + [None], self.histogram):
+            if count:
+                label = f"{lower}-{bound}" if bound else f">={lower}"
+                lines.append(f"  {label:>10s} ms {count:6d} {'#' * max(1, count * 40 // peak)}")
+            lower = bound
+        return lines
+
+
+class StageCounter:
+    """Throughput and backpressure counters for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.bytes = 0
+        # Seconds spent working (wall time for fetches, CPU time for parses)
+        self.busy = 0.0
+        # Seconds spent waiting on the queue between the stages
+        self.blocked = 0.0
+        self.peak_queue = 0
+
+    def add(self, size, busy):
+        self.items += 1
+        self.bytes += size
+        self.busy += busy
+
+    def report(self, elapsed):
+        rate = self.items / elapsed if elapsed else 0
+        line = (f"{self.name:5s}: {self.items} pages ({rate:.1f}/s, {self.bytes / 1024 / 1024:.1f} MB), "
+                f"busy {self.busy:.1f}s, waited on queue {self.blocked:.1f}s")
+        if self.peak_queue:
+            line += f", peak queue {self.peak_queue}"
+        return line
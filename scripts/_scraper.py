@@ -0,0 +1,412 @@
+"""
+Reusable core for scraping BibleHub-style commentaries.
+
+Pieces:
+  - BOOKS, the chapter table every job plan is built from
+  - CommentaryParser, the plugin interface: a name, a chapter URL pattern and
+    a parse() that turns one chapter page into (key, text) entries
+    (plugins are registered in scripts/_scraper_plugins.py)
+  - plan_jobs(), one Job per (commentary, book, chapter)
+  - scrape(), the fetch/parse pipeline: asyncio fetchers over one shared
+    ConnectionPool and AIMD limiter (so every commentary in a run shares the
+    connections and the rate budget), a bounded page queue, and parsing on a
+    process pool; each page is cached and each chapter journaled per
+    commentary (scripts/_scrape_cache.py)
+  - outputs streamed through ChapterOrderedWriter (scripts/_json_stream.py),
+    in canonical order whatever order chapters complete in
+  - run(), the command line shared by scrape-commentaries.py and
+    scrape-ellicott.py
+"""
+
+import argparse, asyncio, re, os, sys, time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from _http_pool import AdaptiveLimiter, ConnectionPool
+from _json_stream import ChapterOrderedWriter
+from _scrape_cache import ScrapeCache
+from _scrape_telemetry import RequestLog, StageCounter
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from data.kjvstudy.markup import html_to_text
+from data.kjvstudy.references import BOOKS as CANONICAL_BOOKS, biblehub_slug
+
+OUT_DIR = os.path.join(PROJECT_DIR, 'data', 'commentaries')
+CACHE_DIR = os.path.join(OUT_DIR, '.cache')
+BASE_URL = 'https://biblehub.com/commentaries'
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/html',
+}
+
+# BibleHub book slugs and chapter counts, from the shared KJV versification
+# (biblehub_slug, our_slug, num_chapters)
+BOOKS = [(biblehub_slug(book.number), book.slug, len(book.verses)) for book in CANONICAL_BOOKS]
+
+# One chapter of one commentary
+Job = namedtuple('Job', 'plugin bh_book slug chapter')
+
+
+class CommentaryParser:
+    """Parser plugin for one commentary.
+
+    Subclasses set ``name`` (output file and cache directory name, and the
+    URL segment under the commentaries root), ``title`` and optionally
+    ``books`` (a subset of BOOKS for commentaries covering only some books),
+    and implement ``parse``. Instances are pickled to the parse workers.
+    """
+
+    name = None
+    title = None
+    books = BOOKS
+
+    def chapter_url(self, root, bh_book, chapter):
+        return f"{root}/{self.name}/{bh_book}/{chapter}.htm"
+
+    def decode(self, body):
+        return body.decode('utf-8-sig', errors='replace')
+
+    def parse(self, html, slug, chapter):
+        """Return [(book-chapter-verse key, text)] for one chapter page."""
+        raise NotImplementedError
+
+
+class BibleHubCommentary(CommentaryParser):
+    """A commentary laid out like BibleHub's /commentaries/<name>/<book>/<chapter>.htm pages."""
+
+    # Commentary shorter than this is a stub or a heading, not a note
+    min_length = 20
+    boundaries = ['<div class="vheading">', '<div id="leftbox">', '<div class="padleft">',
+                  '<div class="chap">', '</div></div></div>']
+
+    def __init__(self, name, title):
+        self.name = name
+        self.title = title
+
+    def clean(self, text):
+        """Strip HTML tags and clean up commentary text."""
+        return html_to_text(text)
+
+    def parse(self, html, slug, chapter):
+        entries = []
+        parts = re.split(r'<div class="versenum">', html)
+
+        for part in parts[1:]:
+            verse_match = re.search(r'(\d+):(\d+)', part)
+            if not verse_match:
+                continue
+
+            verse_num = int(verse_match.group(2))
+
+            commentary = re.sub(r'<div class="verse">.*?</div>', '', part, count=1, flags=re.DOTALL)
+            commentary = re.sub(r'.*?</div>', '', commentary, count=1, flags=re.DOTALL)
+
+            for boundary in self.boundaries:
+                idx = commentary.find(boundary)
+                if idx > 0:
+                    commentary = commentary[:idx]
+
+            commentary = self.clean(commentary)
+
+            if commentary and len(commentary) > self.min_length:
+                key = f"{slug}-{chapter}-{verse_num}"
+                entries.append((key, commentary))
+
+        return entries
+
+
+def plan_jobs(plugins):
+    """Return every (commentary, book, chapter) Job, commentary by commentary in canonical order."""
+    return [Job(plugin, bh_book, slug, ch)
+            for plugin in plugins
+            for bh_book, slug, num_chapters in plugin.books
+            for ch in range(1, num_chapters + 1)]
+
+
+def chapter_id(job):
+    return f"{job.slug}-{job.chapter}"
+
+
+async def fetch_page(pool, job, root, retries=3):
+    """Fetch one chapter page, retrying transient failures. Returns the raw body."""
+    _, _, body = await pool.get_with_retry(job.plugin.chapter_url(root, job.bh_book, job.chapter), retries)
+    return body
+
+
+def parse_page(plugin, body, slug, chapter):
+    """Decode and parse one page; runs in the parse pool. Returns (entries, CPU seconds)."""
+    started = time.process_time()
+    entries = plugin.parse(plugin.decode(body), slug, chapter)
+    return entries, time.process_time() - started
+
+
+async def scrape(jobs, limiter, root, caches, writers, retries, log, executor, parse_slots, queue_size,
+                 reorder_window):
+    """Fetch jobs and parse them on a process pool, journaling each chapter in its commentary's cache.
+
+    Fetchers only download: they put raw pages on a bounded queue and stop
+    fetching while it is full. Parsers hand pages to the process pool, at most
+    ``parse_slots`` at a time, then cache the page, journal its entries and
+    pass them to the commentary's ChapterOrderedWriter. No chapter is started
+    ``reorder_window`` or more chapters ahead of the next one its writer
+    needs, which bounds how many finished chapters wait in memory.
+    Returns the fetch and parse StageCounters.
+    """
+    loop = asyncio.get_running_loop()
+    pages = asyncio.Queue(maxsize=queue_size)
+    written = asyncio.Condition()
+    pending = iter(jobs)
+    fetch_stage, parse_stage = StageCounter('fetch'), StageCounter('parse')
+    done = 0
+    errors = 0
+    verses = 0
+    total_chapters = len(jobs)
+    # Chapters already on disk from a resumed run are written too, but not counted
+    scheduled = {(job.plugin.name, chapter_id(job)) for job in jobs}
+
+    def progress():
+        if done % 50 == 0 or done == total_chapters:
+            print(f"  [{done}/{total_chapters}] {verses} verses extracted ({errors} errors, "
+                  f"{pool.connections_opened} connections, concurrency {limiter.limit:.1f}, "
+                  f"queue {pages.qsize()}/{queue_size})")
+            sys.stdout.flush()
+
+    async def chapter_done(job, entries):
+        # A chapter is done when its writer releases it from the reorder window
+        nonlocal done
+        name = job.plugin.name
+        for chapter in writers[name].add_chapter(chapter_id(job), entries):
+            if (name, chapter) in scheduled:
+                done += 1
+                progress()
+        async with written:
+            written.notify_all()
+
+    async def fetcher():
+        nonlocal errors
+        for job in pending:
+            writer = writers[job.plugin.name]
+            async with written:
+                await written.wait_for(lambda: writer.ahead(chapter_id(job)) < reorder_window)
+            started = time.perf_counter()
+            try:
+                body = await fetch_page(pool, job, root, retries)
+            except Exception as e:
+                fetch_stage.busy += time.perf_counter() - started
+                errors += 1
+                caches[job.plugin.name].record(chapter_id(job), 'error', error=f"{type(e).__name__}: {e}")
+                await chapter_done(job, [])
+                continue
+            fetch_stage.add(len(body), time.perf_counter() - started)
+
+            # Backpressure: block here, holding no connection, while the parsers catch up
+            started = time.perf_counter()
+            await pages.put((job, body))
+            fetch_stage.blocked += time.perf_counter() - started
+            fetch_stage.peak_queue = max(fetch_stage.peak_queue, pages.qsize())
+
+    async def parser():
+        nonlocal errors, verses
+        while True:
+            started = time.perf_counter()
+            item = await pages.get()
+            parse_stage.blocked += time.perf_counter() - started
+            if item is None:
+                return
+            job, body = item
+            cache = caches[job.plugin.name]
+            sha = cache.put_page(body)
+            try:
+                entries, cpu = await loop.run_in_executor(executor, parse_page, job.plugin, body,
+                                                          job.slug, job.chapter)
+            except Exception as e:
+                # The page is cached, so --offline can re-parse it once the parser is fixed
+                errors += 1
+                cache.record(chapter_id(job), 'error', sha256=sha, error=f"parse: {type(e).__name__}: {e}")
+                entries = []
+            else:
+                parse_stage.add(len(body), cpu)
+                verses += len(entries)
+                cache.record(chapter_id(job), 'ok', sha256=sha, entries=entries)
+            await chapter_done(job, entries)
+
+    async with ConnectionPool(headers=HEADERS, limiter=limiter, observer=log) as pool:
+        # The limiter caps requests in flight; one fetcher per possible slot keeps it saturated
+        fetchers = [asyncio.ensure_future(fetcher()) for _ in range(limiter.maximum)]
+        parsers = [asyncio.ensure_future(parser()) for _ in range(parse_slots)]
+        await asyncio.gather(*fetchers)
+        for _ in parsers:
+            await pages.put(None)
+        await asyncio.gather(*parsers)
+
+    return fetch_stage, parse_stage
+
+
+def reparse(jobs, cache, writer, executor, batch_size=64):
+    """Re-run a commentary's parser over its cached pages, offline, streaming the output and a new journal.
+
+    Pages are parsed on the pool ``batch_size`` at a time, so memory stays
+    bounded. A chapter whose parser raises is journaled as an error (with no
+    entries), as in an online run, and the rest carry on. Returns
+    (chapters re-parsed, chapters that failed to parse).
+    """
+    index = cache.journal_index()
+    reparsed = failed = 0
+
+    def parse_batch(batch):
+        nonlocal reparsed, failed
+        # Includes chapters whose page was fetched but failed to parse
+        cached = [(job, record) for job, record in batch if record.get('sha256')]
+        futures = [executor.submit(parse_page, job.plugin, cache.get_page(record['sha256']), job.slug, job.chapter)
+                   for job, record in cached]
+        for (job, record), future in zip(cached, futures):
+            try:
+                entries, _ = future.result()
+            except Exception as e:
+                record.pop('entries', None)
+                record.update(status='error', error=f"parse: {type(e).__name__}: {e}")
+                failed += 1
+            else:
+                record.pop('error', None)
+                record.update(status='ok', entries=entries)
+                reparsed += 1
+        for job, record in batch:
+            writer.add_chapter(chapter_id(job), record['entries'] if record['status'] == 'ok' else [])
+            yield record
+
+    def records():
+        batch = []
+        for job in jobs:
+            position = index.get(chapter_id(job))
+            if position is None:
+                writer.add_chapter(chapter_id(job), [])
+                continue
+            batch.append((job, cache.read_record(position[0])))
+            if len(batch) == batch_size:
+                yield from parse_batch(batch)
+                batch = []
+        yield from parse_batch(batch)
+
+    cache.rewrite_journal(records())
+    return reparsed, failed
+
+
+def failed_chapters(jobs, cache):
+    """Return the ids of chapters without a successful journal record."""
+    index = cache.journal_index()
+    return [chapter_id(job) for job in jobs if index.get(chapter_id(job), (None, None))[1] != 'ok']
+
+
+def run(default_plugins=None, description=None):
+    """Command line entry point. ``default_plugins`` fixes the commentaries to scrape."""
+    from _scraper_plugins import PLUGINS
+
+    parser = argparse.ArgumentParser(description=description or __doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    if default_plugins is None:
+        parser.add_argument('commentaries', nargs='*', metavar='commentary',
+                            help=f"commentaries to scrape (default: all of {', '.join(PLUGINS)})")
+    parser.add_argument('--concurrency', type=int, default=10, help='requests in flight at the start')
+    parser.add_argument('--max-concurrency', type=int, default=64, help='upper bound for the adaptive controller')
+    parser.add_argument('--fixed-concurrency', action='store_true',
+                        help='keep --concurrency requests in flight instead of adapting')
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help='commentaries root serving <commentary>/<book>/<chapter>.htm (e.g. a local test server)')
+    parser.add_argument('--out-dir', default=OUT_DIR, help='directory for <commentary>.json outputs')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='write <commentary>.ndjson, one {"key", "text"} object per line, instead of JSON')
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help='root for each commentary\'s page cache and checkpoint journal')
+    parser.add_argument('--resume', action='store_true',
+                        help='skip chapters already completed in the journal and retry failed ones')
+    parser.add_argument('--offline', action='store_true',
+                        help='re-parse cached pages without touching the network')
+    parser.add_argument('--retries', type=int, default=3, help='retries per chapter for transient failures')
+    parser.add_argument('--parse-workers', type=int, default=os.cpu_count() or 1,
+                        help='processes parsing fetched pages')
+    parser.add_argument('--queue-size', type=int, default=64,
+                        help='fetched pages allowed to wait for a parser before fetching pauses')
+    parser.add_argument('--reorder-window', type=int, default=256,
+                        help='chapters fetching may run ahead of the output, bounding the reorder buffer')
+    parser.add_argument('--telemetry', help='per-request JSONL log (default: telemetry.jsonl in --cache-dir)')
+    args = parser.parse_args()
+
+    names = default_plugins if default_plugins is not None else args.commentaries or list(PLUGINS)
+    unknown = [name for name in names if name not in PLUGINS]
+    if unknown:
+        parser.error(f"unknown commentary: {', '.join(unknown)} (available: {', '.join(PLUGINS)})")
+    plugins = [PLUGINS[name] for name in names]
+
+    caches = {plugin.name: ScrapeCache(os.path.join(args.cache_dir, plugin.name)) for plugin in plugins}
+    jobs_by_plugin = {plugin.name: plan_jobs([plugin]) for plugin in plugins}
+    executor = ProcessPoolExecutor(max_workers=args.parse_workers)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    writers = {}
+    for plugin in plugins:
+        out_path = os.path.join(args.out_dir, f"{plugin.name}.{'ndjson' if args.ndjson else 'json'}")
+        writers[plugin.name] = ChapterOrderedWriter(out_path, [chapter_id(job) for job in jobs_by_plugin[plugin.name]],
+                                                    ndjson=args.ndjson)
+
+    if args.offline:
+        for plugin in plugins:
+            reparsed, failed = reparse(jobs_by_plugin[plugin.name], caches[plugin.name], writers[plugin.name],
+                                       executor)
+            print(f"Re-parsed {reparsed} cached {plugin.name} chapters"
+                  + (f" ({failed} failed to parse, see the journal)" if failed else ""))
+    else:
+        pending = []
+        for plugin in plugins:
+            cache = caches[plugin.name]
+            writer = writers[plugin.name]
+            jobs = jobs_by_plugin[plugin.name]
+            if args.resume:
+                index = cache.journal_index()
+                todo = []
+                for job in jobs:
+                    offset, status = index.get(chapter_id(job), (None, None))
+                    if status == 'ok':
+                        # Already on disk: read back from the journal only when its turn to be written comes
+                        writer.add_chapter(chapter_id(job), lambda offset=offset: cache.read_record(offset)['entries'])
+                    else:
+                        todo.append(job)
+                print(f"Resuming {plugin.name}: {len(jobs) - len(todo)} chapters already complete")
+            else:
+                cache.reset_journal()
+                todo = jobs
+            pending.extend(todo)
+
+        print(f"Fetching {len(pending)} chapters of {', '.join(names)} with {args.concurrency} concurrent requests...")
+        sys.stdout.flush()
+        limiter = AdaptiveLimiter(args.concurrency, maximum=max(args.concurrency, args.max_concurrency),
+                                  adaptive=not args.fixed_concurrency)
+        os.makedirs(args.cache_dir, exist_ok=True)
+        log = RequestLog(args.telemetry or os.path.join(args.cache_dir, 'telemetry.jsonl'))
+        # Two parse slots per worker so each process has its next page queued
+        stages = asyncio.run(scrape(pending, limiter, args.base_url.rstrip('/'), caches, writers, args.retries, log,
+                                    executor, 2 * args.parse_workers, args.queue_size, args.reorder_window))
+        log.close()
+        print("\n=== TELEMETRY ===")
+        for line in log.summary(limiter):
+            print(line)
+        for stage in stages:
+            print(stage.report(time.perf_counter() - log.started))
+    executor.shutdown()
+
+    print(f"\n=== DONE ===")
+    for plugin in plugins:
+        cache = caches[plugin.name]
+        cache.close()
+        writer = writers[plugin.name]
+        writer.close()
+        failed = failed_chapters(jobs_by_plugin[plugin.name], cache)
+
+        size_mb = os.path.getsize(writer.path) / 1024 / 1024
+        print(f"{plugin.title}: {writer.count} verse commentaries, {len(failed)} errors"
+              + (f" (rerun with --resume to retry: {', '.join(failed[:10])}{' ...' if len(failed) > 10 else ''})"
+                 if failed else ''))
+        print(f"  Written to {writer.path} ({size_mb:.1f} MB, at most {writer.peak_buffered} chapters buffered)")
+    sys.stdout.flush()
@@ -0,0 +1,21 @@
+"""
+Commentary parser plugins for scripts/_scraper.py.
+
+Each commentary is one registered plugin. A BibleHub commentary that uses the
+standard versenum/verse page layout only needs a name and a title; one with
+different markup subclasses BibleHubCommentary (or CommentaryParser) and
+overrides parse().
+"""
+
+from _scraper import BibleHubCommentary
+
+PLUGINS = {}
+
+
+def register(plugin):
+    PLUGINS[plugin.name] = plugin
+    return plugin
+
+
+# Charles John Ellicott, 1878-1884 (Public Domain)
+register(BibleHubCommentary('ellicott', "Ellicott's Commentary for English Readers"))
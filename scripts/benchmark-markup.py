@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Verify and benchmark the single-pass markup converters in data/kjvstudy/markup.py
+against the original multi-pass regex pipelines they replace.
+
+The golden corpus below covers every rule (bold/italic/super/small-caps/
+reference/x-p paragraphs for OSIS; bld/ital spans, links, <p>/<br>, entities
+for BibleHub HTML) plus the ordering quirks that force a regex fallback.
+Every input must produce byte-identical output, or the script exits 1.
+
+Usage:
+  python scripts/benchmark-markup.py                # golden corpus + benchmark
+  python scripts/benchmark-markup.py --fuzz 100000  # also compare random markup
+"""
+
+import argparse, os, random, sys, timeit
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from data.kjvstudy.markup import clean_html_regex, html_to_text, osis_to_text, strip_osis_regex
+
+OSIS_GOLDEN = [
+    '',
+    'Plain commentary text with no markup at all.',
+    '<hi type="bold">Verse 1.</hi> In the beginning <hi type="italic">God</hi> created.',
+    'The <hi type="small-caps">Lord</hi> is my shepherd.',
+    'See note <hi type="super">12</hi> and <hi type="super">a</hi> and <hi type="super"></hi>.',
+    'Compare <reference osisRef="John.1.1">John 1:1</reference> with <reference osisRef="Heb.11.3">Heb 11:3</reference>.',
+    '<div type="paragraph">First.</div><div type="x-p" sID="p1"/>Second.<div type="x-p"/><div type="x-p"/><div type="x-p"/>Third.',
+    '<hi type="italic"><reference osisRef="Gen.1.1">Gen 1:1</reference></hi> and <reference>a <hi type="bold">b</hi></reference>',
+    '<hi type="small-caps">Lord <reference osisRef="Ps.23.1">Ps 23:1</reference></hi>',
+    '<note type="x-strongsMarkup">H430</note> <lb/> <milestone type="x-p"/> tail',
+    'Spaces   and\ttabs \t mixed,\n\n\n\n\nand blank lines.',
+    '  leading and trailing whitespace  \n',
+    # Fallbacks: nesting, elements spanning lines, stray "<", unclosed elements
+    '<hi type="bold">nested <hi type="italic">x</hi> y</hi> z',
+    '<hi type="bold">spans\na line</hi>',
+    '<hi type="bold">before<div type="x-p"/>after</hi>',
+    '<hi type="super"><reference>1</reference></hi>',
+    'a < b <hi type="bold">c</hi>',
+    '<hi type="bold">never closed',
+    '<reference a>x <reference b>y</reference> z</reference>',
+    '<hi type="small-caps">straße ²</hi>',
+]
+
+HTML_GOLDEN = [
+    '',
+    'Plain commentary text with no markup at all.',
+    '<span class="bld">Verse 1.</span> In the <span class= "ital">beginning</span> God created.',
+    'See <a href="/john/1-1.htm">John 1:1</a> and <abbr title="x">cf.</abbr> also.',
+    'One<p>Two<br>Three<br/>Four<br />Five<p class="x">Six',
+    '&mdash; &ndash; &amp; &lt;tag&gt; &quot;q&quot; &#39;s &#8220;curly&#8221; &nbsp;x &unknown;',
+    '<span class=\n"bld">split open tag</span>',
+    '<span class="x">not recognised</span> <b>bold tag</b>',
+    'Spaces   and\ttabs \t mixed,\n\n\n\nand blank lines.',
+    # Fallbacks: nesting, lines, stray "<", unclosed, entity chains
+    '<span class="bld">a <span class="x">b</span> c</span>',
+    '<span class="ital">spans\na line</span>',
+    'a < b <span class="bld">c</span>',
+    '<span class="bld">never closed',
+    '&amp;lt; &amp;mdash; &amp;amp; &amp;#39; &amp;#160;',
+    '&x&#160;; &&#1;y; &amp;&#2;z;',
+]
+
+OSIS_FUZZ = [
+    '<hi type="bold">', '<hi type="italic">', '<hi type="super">', '<hi type="small-caps">', '</hi>',
+    '<hi type="u">', '<reference osisRef="Gen.1.1">', '</reference>', '<reference/>', '<div type="x-p"/>',
+    '<div>', '</div>', '<note>', '</note>', '<', '>', '<>', '\n', '  ', '\t', '12', 'Lord', 'a', ' b ',
+]
+
+HTML_FUZZ = [
+    '<span class="bld">', '<span class= "ital">', '<span class="x">', '</span>', '<a href="x">', '</a>',
+    '<abbr>', '<p>', '<br>', '<br />', '&mdash;', '&ndash;', '&amp;', '&lt;', '&gt;', '&quot;', '&#39;',
+    '&#160;', '&nbsp;', '&', ';', '<', '>', '\n', '  ', '\t', 'word', ' x ',
+]
+
+# Representative verse-sized inputs for timing
+OSIS_SAMPLE = (
+    '<div type="paragraph"><hi type="bold">Verse 1.</hi> In the beginning <hi type="italic">God</hi> '
+    'created; see <reference osisRef="John.1.1">John 1:1</reference> and <reference osisRef="Heb.11.3">'
+    'Heb 11:3</reference>. The <hi type="small-caps">Lord</hi> is <hi type="super">2</hi> here.</div>'
+    '<div type="x-p" sID="p1"/>' + 'Plain text of commentary that goes on for a while. ' * 6
+) * 3
+HTML_SAMPLE = (
+    '<span class="bld">Verse 1.</span> In the <span class="ital">beginning</span>&mdash;God created, '
+    '<a href="/john/1-1.htm">John 1:1</a>; the heavens &amp; the earth.<p>Another paragraph<br />with '
+    '&quot;quotes&quot; and &#8220;curly&#8221; text. ' + 'Plain text. ' * 20
+) * 3
+
+
+def compare(label, new, old, inputs):
+    """Return the number of inputs where new and old disagree, printing the first few."""
+    mismatches = 0
+    for text in inputs:
+        if new(text) != old(text):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  MISMATCH {label}: {text!r}")
+    return mismatches
+
+
+def fuzz_inputs(tokens, count, seed):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield ''.join(rnd.choice(tokens) for _ in range(rnd.randint(0, 25)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fuzz', type=int, default=0, help='random inputs per format to compare')
+    parser.add_argument('--number', type=int, default=5000, help='conversions per benchmark timing')
+    args = parser.parse_args()
+
+    print("=== GOLDEN CORPUS ===")
+    failures = compare('osis', osis_to_text, strip_osis_regex, OSIS_GOLDEN)
+    failures += compare('html', html_to_text, clean_html_regex, HTML_GOLDEN)
+    print(f"  {len(OSIS_GOLDEN) + len(HTML_GOLDEN)} inputs, {failures} mismatches")
+
+    if args.fuzz:
+        print(f"\n=== FUZZ ({args.fuzz} inputs per format) ===")
+        fuzz_failures = compare('osis', osis_to_text, strip_osis_regex, fuzz_inputs(OSIS_FUZZ, args.fuzz, 1))
+        fuzz_failures += compare('html', html_to_text, clean_html_regex, fuzz_inputs(HTML_FUZZ, args.fuzz, 2))
+        print(f"  {fuzz_failures} mismatches")
+        failures += fuzz_failures
+
+    print(f"\n=== BENCHMARK ({args.number} conversions each) ===")
+    for label, new, old, text in [
+        ('osis', osis_to_text, strip_osis_regex, OSIS_SAMPLE),
+        ('html', html_to_text, clean_html_regex, HTML_SAMPLE),
+        ('plain', osis_to_text, strip_osis_regex, OSIS_SAMPLE.split('</div>')[-1]),
+    ]:
+        old_us = timeit.timeit(lambda: old(text), number=args.number) / args.number * 1e6
+        new_us = timeit.timeit(lambda: new(text), number=args.number) / args.number * 1e6
+        print(f"  {label:6s} regex {old_us:7.1f} us   single-pass {new_us:7.1f} us   {old_us / new_us:5.1f}x")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Verify and benchmark the verse-reference codec in data/kjvstudy/references.py
+over all 31,102 KJV verses.
+
+Every verse is formatted in each dataset's key form (commentary slug keys,
+interlinear and cross-reference colon keys, display references, OSIS) and
+parsed back; every round trip must give the same packed id, or the script
+exits 1. It also checks that the id order matches the canonical order and
+that every key in the interlinear and cross-reference files parses to a valid
+verse.
+
+Usage:
+  python scripts/benchmark-references.py
+  python scripts/benchmark-references.py --no-data   # skip the dataset scan
+"""
+
+import argparse, json, os, sys, time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from data.kjvstudy import references
+from data.kjvstudy.references import (
+    is_valid, iter_verses, parse, to_colon_key, to_interlinear_key, to_key, to_osis, to_reference,
+)
+
+KJVSTUDY_DIR = os.path.join(PROJECT_DIR, 'data', 'kjvstudy')
+
+FORMATS = [
+    ('key', to_key),
+    ('interlinear', to_interlinear_key),
+    ('colon key', to_colon_key),
+    ('reference', to_reference),
+    ('osis', to_osis),
+]
+
+
+def verify_round_trips(verse_ids):
+    failures = 0
+    for label, fmt in FORMATS:
+        for verse_id in verse_ids:
+            text = fmt(verse_id)
+            if parse(text) != verse_id:
+                failures += 1
+                if failures <= 5:
+                    print(f"  MISMATCH {label}: {text!r} -> {parse(text):#x}, expected {verse_id:#x}")
+    return failures
+
+
+def verify_datasets():
+    """Parse every interlinear key and cross-reference key/target. Returns (references, failures)."""
+    checked = failures = 0
+
+    def check(text):
+        nonlocal checked, failures
+        checked += 1
+        try:
+            ok = is_valid(parse(text))
+        except ValueError:
+            ok = False
+        if not ok:
+            failures += 1
+            if failures <= 5:
+                print(f"  INVALID: {text!r}")
+
+    for subdir in ('interlinear', 'cross_references'):
+        directory = os.path.join(KJVSTUDY_DIR, subdir)
+        for filename in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for key, value in data.items():
+                check(key)
+                if subdir == 'cross_references':
+                    for target in value:
+                        check(target['ref'])
+    return checked, failures
+
+
+def best_of(func, rounds=5):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--no-data', action='store_true', help='skip parsing the interlinear and cross-reference files')
+    args = parser.parse_args()
+
+    verse_ids = list(iter_verses())
+    print(f"=== ROUND TRIPS ({len(verse_ids)} verses x {len(FORMATS)} formats) ===")
+    failures = 0
+    if len(verse_ids) != 31102:
+        print(f"  expected 31102 verses, versification has {len(verse_ids)}")
+        failures += 1
+    if verse_ids != sorted(verse_ids) or not all(map(is_valid, verse_ids)):
+        print("  verse ids are not in canonical order")
+        failures += 1
+    failures += verify_round_trips(verse_ids)
+    print(f"  {failures} mismatches")
+
+    if not args.no_data:
+        print("\n=== DATASET KEYS ===")
+        checked, data_failures = verify_datasets()
+        print(f"  {checked} references, {data_failures} invalid")
+        failures += data_failures
+
+    print(f"\n=== BENCHMARK (per verse, best of 5 over {len(verse_ids)}) ===")
+    n = len(verse_ids)
+    for label, fmt in FORMATS:
+        texts = [fmt(verse_id) for verse_id in verse_ids]
+
+        def cold():
+            parse.cache_clear()
+            references.book_number.cache_clear()
+            for text in texts:
+                parse(text)
+
+        cold_us = best_of(cold) / n * 1e6
+        warm_us = best_of(lambda: [parse(text) for text in texts]) / n * 1e6
+        format_us = best_of(lambda: [fmt(verse_id) for verse_id in verse_ids]) / n * 1e6
+        print(f"  {label:12s} parse {cold_us:5.2f} us (cached {warm_us:5.2f} us)   format {format_us:5.2f} us")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compile data/kjvstudy/cross_references/*.json into
+data/kjvstudy/cross_references.graph, a compressed-sparse-row graph over all
+31,102 verses with forward and reverse edge lists and interned note labels.
+Read it with data/kjvstudy/cross_reference_graph.py.
+
+Usage:
+  python scripts/build-cross-reference-graph.py              # build the graph
+  python scripts/build-cross-reference-graph.py --benchmark  # build, then time queries
+"""
+
+import argparse, json, os, sys, time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PROJECT_DIR)
+
+from data.kjvstudy.cross_reference_graph import GRAPH_PATH, CrossReferenceGraph, write_graph
+from data.kjvstudy.references import BOOKS, iter_verses, parse
+
+CROSS_REFERENCES_DIR = os.path.join(PROJECT_DIR, 'data', 'kjvstudy', 'cross_references')
+
+
+def iter_edges():
+    """Yield (source verse id, target verse id, note), one book file at a time."""
+    for filename in sorted(os.listdir(CROSS_REFERENCES_DIR)):
+        if not filename.endswith('.json'):
+            continue
+        with open(os.path.join(CROSS_REFERENCES_DIR, filename), 'r', encoding='utf-8') as f:
+            book_data = json.load(f)
+        for key, targets in book_data.items():
+            source = parse(key)
+            for target in targets:
+                yield source, parse(target['ref']), target.get('note')
+
+
+def best_of(func, rounds=5):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark(path):
+    started = time.perf_counter()
+    graph = CrossReferenceGraph(path)
+    print(f"Open: {(time.perf_counter() - started) * 1000:.2f} ms")
+    verse_ids = list(iter_verses())
+    n = len(verse_ids)
+    for label, query in [
+        ('neighbors', lambda: [graph.neighbors(v) for v in verse_ids]),
+        ('references_to', lambda: [graph.references_to(v) for v in verse_ids]),
+    ]:
+        print(f"{label}: {best_of(query) / n * 1e6:.2f} us per verse over {n} verses")
+    sample = verse_ids[::311]
+    elapsed = best_of(lambda: [graph.k_hop(v, 2) for v in sample])
+    print(f"k_hop(k=2): {elapsed / len(sample) * 1e6:.1f} us per verse over {len(sample)} verses")
+    chapters = [(book.number, chapter) for book in BOOKS for chapter in range(1, len(book.verses) + 1)]
+    elapsed = best_of(lambda: [graph.most_connected(b, c) for b, c in chapters], rounds=1)
+    print(f"most_connected: {elapsed / len(chapters) * 1e6:.1f} us per chapter over {len(chapters)} chapters")
+    graph.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default=str(GRAPH_PATH), help='graph file to write')
+    parser.add_argument('--benchmark', action='store_true', help='time queries against the built graph')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    nodes, edges = write_graph(args.out, iter_edges())
+    size_kb = os.path.getsize(args.out) / 1024
+    print(f"Compiled {edges} cross-references over {nodes} verses in {time.perf_counter() - started:.1f}s")
+    print(f"Written to {args.out} ({size_kb:.0f} KB)")
+
+    if args.benchmark:
+        benchmark(args.out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Reshard data/kjvstudy/interlinear/*.json into data/kjvstudy/interlinear.store:
+words as fixed-width integer rows in canonical verse order, Strong's numbers
+as integers, and every distinct string (including the repeated Strong's
+definitions) stored once. Read it with data/kjvstudy/interlinear_store.py,
+which decodes one chapter at a time instead of a whole book.
+
+The build checks that every verse decodes back to exactly the words in the
+JSON, and exits 1 if any does not.
+
+Usage:
+  python scripts/build-interlinear-store.py              # build and verify the store
+  python scripts/build-interlinear-store.py --benchmark  # also compare lookup time and memory
+"""
+
+import argparse, json, os, sys, time, tracemalloc
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PROJECT_DIR)
+
+from data.kjvstudy.interlinear_store import STORE_PATH, InterlinearStore, write_interlinear_store
+from data.kjvstudy.references import parse
+
+KJVSTUDY_DIR = os.path.join(PROJECT_DIR, 'data', 'kjvstudy')
+INTERLINEAR_DIR = os.path.join(KJVSTUDY_DIR, 'interlinear')
+
+
+def iter_books():
+    """Yield (filename, {key: words}), one book file at a time."""
+    for filename in sorted(os.listdir(INTERLINEAR_DIR)):
+        if filename.endswith('.json'):
+            with open(os.path.join(INTERLINEAR_DIR, filename), 'r', encoding='utf-8') as f:
+                yield filename, json.load(f)
+
+
+def iter_verses():
+    for _, book_data in iter_books():
+        for key, words in book_data.items():
+            yield parse(key), words
+
+
+def verify(path):
+    """Compare every verse in the store with the JSON. Returns the number of mismatches."""
+    store = InterlinearStore(path, cache_size=1)
+    failures = 0
+    for filename, book_data in iter_books():
+        for key, words in book_data.items():
+            if store.get_verse(parse(key)) != words:
+                failures += 1
+                if failures <= 5:
+                    print(f"  MISMATCH {filename}: {key}")
+    store.close()
+    return failures
+
+
+def measure(func):
+    """(milliseconds, peak traced KB) for one call; timed without tracemalloc running."""
+    started = time.perf_counter()
+    func()
+    elapsed = (time.perf_counter() - started) * 1000
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def benchmark(path):
+    store = InterlinearStore(path, cache_size=0)
+    for filename, reference in [('isaiah.json', 'Isaiah 53:5'), ('exodus.json', 'Exodus 20:3'),
+                                ('acts.json', 'Acts 2:38')]:
+        json_ms, json_kb = measure(lambda: load_json(os.path.join(INTERLINEAR_DIR, filename)))
+        store_ms, store_kb = measure(lambda: store.get_verse(reference))
+        print(f"  {reference:12s} book JSON {json_ms:6.1f} ms {json_kb / 1024:5.1f} MB   "
+              f"store chapter {store_ms:5.2f} ms {store_kb:5.0f} KB")
+    store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default=str(STORE_PATH), help='store file to write')
+    parser.add_argument('--benchmark', action='store_true', help='compare a verse lookup with loading its book JSON')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    verses, words, strings = write_interlinear_store(args.out, iter_verses())
+    size_mb = os.path.getsize(args.out) / 1024 / 1024
+    print(f"Resharded {words} words in {verses} verses ({strings} distinct strings) "
+          f"in {time.perf_counter() - started:.1f}s")
+    print(f"Written to {args.out} ({size_mb:.1f} MB)")
+
+    failures = verify(args.out)
+    print(f"Verified {verses} verses: {failures} mismatches")
+
+    if args.benchmark:
+        benchmark(args.out)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Compile data/kjvstudy/resources/*.json and their slug indexes into
+data/kjvstudy/resources.snapshot, a versioned pickle keyed by a content hash
+of the source files. data/kjvstudy loads it instead of the JSON while the hash
+still matches.
+
+Usage:
+  python scripts/build-resource-snapshot.py              # build the snapshot
+  python scripts/build-resource-snapshot.py --benchmark  # build, then time imports
+  python scripts/build-resource-snapshot.py --store      # also build resources.store
+                                                          # for KJVSTUDY_RESOURCE_STORE
+"""
+
+import argparse, os, statistics, subprocess, sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PROJECT_DIR)
+
+# Child process that reports how long `import data.kjvstudy` took
+IMPORT_PROBE = (
+    "import time; t = time.perf_counter(); import data.kjvstudy; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def time_import(use_snapshot, runs):
+    """Time a cold `import data.kjvstudy` in fresh interpreters. Returns seconds per run."""
+    env = dict(os.environ, KJVSTUDY_RESOURCE_SNAPSHOT='1' if use_snapshot else '0')
+    env.pop('KJVSTUDY_LAZY_RESOURCES', None)
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', IMPORT_PROBE], cwd=PROJECT_DIR, env=env,
+                             capture_output=True, text=True, check=True)
+        timings.append(float(out.stdout.strip()))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--benchmark', action='store_true', help='compare import time for JSON vs snapshot')
+    parser.add_argument('--store', action='store_true', help='also write the memory-mapped shared store')
+    parser.add_argument('--runs', type=int, default=10, help='interpreter launches per benchmark path')
+    args = parser.parse_args()
+
+    # Import with the snapshot disabled so a stale snapshot is never re-read
+    os.environ['KJVSTUDY_RESOURCE_SNAPSHOT'] = '0'
+    os.environ['KJVSTUDY_LAZY_RESOURCES'] = '1'
+    import data.kjvstudy as kjvstudy
+
+    path = kjvstudy._write_snapshot()
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"Written to {path} ({size_mb:.1f} MB, source hash {kjvstudy._source_hash()[:12]})")
+
+    if args.store:
+        store_path = kjvstudy._write_store()
+        size_mb = os.path.getsize(store_path) / 1024 / 1024
+        print(f"Written to {store_path} ({size_mb:.1f} MB)")
+
+    collisions = kjvstudy.find_slug_collisions()
+    if collisions:
+        print(f"\n{len(collisions)} slugs shared across categories (resolve_slug returns the first):")
+        for slug, keys in sorted(collisions.items()):
+            print(f"  {slug}: {', '.join(keys)}")
+
+    if args.benchmark:
+        print(f"\n=== IMPORT BENCHMARK ({args.runs} runs each) ===")
+        results = {}
+        for label, use_snapshot in [('json', False), ('snapshot', True)]:
+            timings = time_import(use_snapshot, args.runs)
+            results[label] = statistics.median(timings)
+            print(f"  {label:9s} median {results[label] * 1000:7.1f} ms   min {min(timings) * 1000:7.1f} ms")
+        print(f"  speedup   {results['json'] / results['snapshot']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Build data/kjvstudy/search.index, the BM25 full-text index read by
+data/kjvstudy/search_index.py, from:
+
+  - data/kjvstudy/verse_commentary/*.json   one document per verse
+                                            (source "verse_commentary")
+  - data/commentaries/*.json                one document per verse, source =
+                                            module name (if converted/scraped;
+                                            dotfiles such as the convert
+                                            manifest are skipped)
+  - data/kjvstudy/resources/*.json          one document per item
+                                            (source "resources")
+
+Each input file is tokenized and turned into encoded postings on a worker
+process (--jobs, default one per CPU); the main process only concatenates
+the per-file postings, in a fixed file order, so the index is the same for
+any number of workers.
+
+Usage:
+  python scripts/build-search-index.py                    # build the index
+  python scripts/build-search-index.py --benchmark        # build, then time queries
+  python scripts/build-search-index.py --query '"lamb of god"' --testament nt
+"""
+
+import argparse, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PROJECT_DIR)
+
+from data.kjvstudy.references import book_number, pack, parse, to_key
+from data.kjvstudy.search_index import INDEX_PATH, PostingsBuilder, SearchIndex, write_index
+
+KJVSTUDY_DIR = os.path.join(PROJECT_DIR, 'data', 'kjvstudy')
+VERSE_COMMENTARY_DIR = os.path.join(KJVSTUDY_DIR, 'verse_commentary')
+RESOURCES_DIR = os.path.join(KJVSTUDY_DIR, 'resources')
+COMMENTARIES_DIR = os.path.join(PROJECT_DIR, 'data', 'commentaries')
+
+BENCHMARK_QUERIES = [
+    ('propitiation', {}),
+    ('covenant faithfulness', {}),
+    ('god', {}),
+    ('"lamb of god"', {}),
+    ('"kingdom of heaven" righteousness', {'testament': 'nt'}),
+    ('grace', {'book': 'Romans'}),
+    ('angel', {'source': 'resources'}),
+]
+
+
+def list_units():
+    """Every input file as (kind, source, path), in index order."""
+    units = []
+    for filename in sorted(os.listdir(VERSE_COMMENTARY_DIR)):
+        if filename.endswith('.json'):
+            units.append(('verse_commentary', 'verse_commentary', os.path.join(VERSE_COMMENTARY_DIR, filename)))
+    if os.path.isdir(COMMENTARIES_DIR):
+        for filename in sorted(os.listdir(COMMENTARIES_DIR)):
+            # Dotfiles are bookkeeping (the converter's .convert-manifest.json), not commentary
+            if filename.endswith('.json') and not filename.startswith('.'):
+                units.append(('commentary', filename[:-5], os.path.join(COMMENTARIES_DIR, filename)))
+    for filename in sorted(os.listdir(RESOURCES_DIR)):
+        if filename.endswith('.json'):
+            units.append(('resources', 'resources', os.path.join(RESOURCES_DIR, filename)))
+    return units
+
+
+def collect_text(value):
+    """All strings in a nested resource value, joined."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return '\n'.join(f"{key}\n{collect_text(item)}" for key, item in value.items())
+    if isinstance(value, list):
+        return '\n'.join(collect_text(item) for item in value)
+    return ''
+
+
+def index_unit(unit):
+    """Tokenize one input file. Returns (docs, encoded postings); runs in pool workers."""
+    kind, source, path = unit
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    builder = PostingsBuilder()
+
+    if kind == 'verse_commentary':
+        book = book_number(data['book'])
+        for chapter, verses in data['commentary'].items():
+            for verse, entry in verses.items():
+                verse_id = pack(book, int(chapter), int(verse))
+                builder.add(source, to_key(verse_id), verse_id, collect_text(list(entry.values())))
+    elif kind == 'commentary':
+        for key, text in data.items():
+            try:
+                verse_id = parse(key)
+            except ValueError:
+                verse_id = None
+            builder.add(source, key, verse_id, text)
+    else:
+        for category, subcategories in data.items():
+            for sub_name, sub_value in subcategories.items():
+                if isinstance(sub_value, dict):
+                    for item_name, item_value in sub_value.items():
+                        builder.add(source, f"{category}/{sub_name}/{item_name}", None,
+                                    f"{item_name}\n{collect_text(item_value)}")
+                else:
+                    builder.add(source, f"{category}/{sub_name}", None, f"{sub_name}\n{collect_text(sub_value)}")
+
+    return builder.docs, builder.chunks()
+
+
+def benchmark(path, rounds=20):
+    started = time.perf_counter()
+    index = SearchIndex(path)
+    print(f"Open: {(time.perf_counter() - started) * 1000:.2f} ms")
+    for query, filters in BENCHMARK_QUERIES:
+        index._cache.clear()
+        index._position_cache.clear()
+        started = time.perf_counter()
+        hits = index.search(query, **filters)
+        cold = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(rounds):
+            index.search(query, **filters)
+        warm = (time.perf_counter() - started) / rounds
+        top = hits[0].key if hits else '-'
+        print(f"  {query:40s} {str(filters):24s} cold {cold * 1000:6.2f} ms  cached {warm * 1000:6.2f} ms  "
+              f"top {top}")
+    index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default=str(INDEX_PATH), help='index file to write')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='worker processes (default: one per CPU)')
+    parser.add_argument('--benchmark', action='store_true', help='time sample queries against the built index')
+    parser.add_argument('--query', help='run one query against the existing index instead of building')
+    parser.add_argument('--book', help='with --query: only this book')
+    parser.add_argument('--testament', choices=['ot', 'nt'], help='with --query: only this testament')
+    parser.add_argument('--source', help='with --query: only this source')
+    parser.add_argument('--limit', type=int, default=10, help='with --query: number of results')
+    args = parser.parse_args()
+
+    if args.query:
+        index = SearchIndex(args.out)
+        started = time.perf_counter()
+        hits = index.search(args.query, args.limit, book=args.book, testament=args.testament, source=args.source)
+        elapsed = time.perf_counter() - started
+        for hit in hits:
+            print(f"{hit.score:7.2f}  {hit.source:18s} {hit.key}")
+        print(f"{len(hits)} results in {elapsed * 1000:.2f} ms")
+        return
+
+    started = time.perf_counter()
+    units = list_units()
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            # map() yields in submission order, so document ids do not depend on scheduling
+            documents, terms = write_index(args.out, pool.map(index_unit, units, chunksize=4))
+    else:
+        documents, terms = write_index(args.out, map(index_unit, units))
+    size_mb = os.path.getsize(args.out) / 1024 / 1024
+    print(f"Indexed {documents} documents from {len(units)} files ({terms} terms) "
+          f"in {time.perf_counter() - started:.1f}s on {args.jobs} process(es)")
+    print(f"Written to {args.out} ({size_mb:.1f} MB)")
+
+    if args.benchmark:
+        benchmark(args.out)
+
+
+if __name__ == '__main__':
+    main()
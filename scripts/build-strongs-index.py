@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Build data/kjvstudy/strongs.index, an inverted index from every Strong's
+number to the verses (and word positions) it occurs in, by streaming
+data/kjvstudy/interlinear/*.json once. One book file is loaded at a time, so
+peak memory is one book plus the postings. Read it with
+data/kjvstudy/strongs_index.py.
+
+Usage:
+  python scripts/build-strongs-index.py              # build the index
+  python scripts/build-strongs-index.py --benchmark  # build, then time lookups
+"""
+
+import argparse, json, os, sys, time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PROJECT_DIR)
+
+from data.kjvstudy.references import BOOK_NAMES, parse
+from data.kjvstudy.strongs_index import INDEX_PATH, StrongsIndex, write_strongs_index
+
+KJVSTUDY_DIR = os.path.join(PROJECT_DIR, 'data', 'kjvstudy')
+INTERLINEAR_DIR = os.path.join(KJVSTUDY_DIR, 'interlinear')
+
+
+def build_postings():
+    """Stream the interlinear files. Returns ({number: [(verse id, position)]}, verses, words)."""
+    postings = {}
+    verse_count = word_count = 0
+    for filename in sorted(os.listdir(INTERLINEAR_DIR)):
+        if not filename.endswith('.json'):
+            continue
+        with open(os.path.join(INTERLINEAR_DIR, filename), 'r', encoding='utf-8') as f:
+            book_data = json.load(f)
+        for key, words in book_data.items():
+            verse_id = parse(key)
+            verse_count += 1
+            for word in words:
+                number = word.get('strongs')
+                if number:
+                    postings.setdefault(number, []).append((verse_id, word['position']))
+                    word_count += 1
+        del book_data
+    return postings, verse_count, word_count
+
+
+def benchmark(path, rounds=5):
+    index = StrongsIndex(path)
+    numbers = list(index.numbers())
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for number in numbers:
+            index.verses(number)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"verses(): {best / len(numbers) * 1e6:.2f} us per lookup over {len(numbers)} numbers")
+    started = time.perf_counter()
+    total = sum(len(index.verses(number)) for number in numbers)
+    print(f"Materialized {total} verse ids in {(time.perf_counter() - started) * 1000:.1f} ms")
+    index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default=str(INDEX_PATH), help='index file to write')
+    parser.add_argument('--benchmark', action='store_true', help='time lookups against the built index')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    postings, verse_count, word_count = build_postings()
+    keys = write_strongs_index(args.out, postings, BOOK_NAMES, meta={'verses': verse_count, 'words': word_count})
+    size_kb = os.path.getsize(args.out) / 1024
+    print(f"Indexed {word_count} words in {verse_count} verses under {keys} Strong's numbers "
+          f"in {time.perf_counter() - started:.1f}s")
+    print(f"Written to {args.out} ({size_kb:.0f} KB)")
+
+    if args.benchmark:
+        benchmark(args.out)
+
+
+if __name__ == '__main__':
+    main()
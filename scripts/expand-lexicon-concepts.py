@@ -1,16 +1,46 @@
 #!/usr/bin/env python3
 """
-Expand lexicon-concepts.json from 8 entries to 50+ using kjvstudy word_studies.json data.
+Sync lexicon-concepts.json with kjvstudy word_studies.json.
+
+New word studies are added as concepts. Existing concepts are regenerated only
+when their word study's content hash changed since the last sync (recorded in
+lexicon-concepts.manifest.json) or the generator did: this script (with its
+CATEGORY_MAP) or the --score mode. Fields edited by hand since they were
+generated are left alone. Concepts with no word study are never touched.
+Both files are written atomically; --dry-run only reports.
+
+Categories come from CATEGORY_MAP through an inverted index of exact and
+stemmed terms, so "sanctification" files under the same category as
+"sanctify"; roots of three letters or fewer only match whole words, so
+"wits" is not "witness". --score categorizes slugs that match no term from
+their word-study meanings and notes, and --strongs runs the same scoring over
+the full Strong's lexicons, skipping proper names. A scored category needs a
+second supporting match or one strong, distinctive one.
 """
 
+import argparse
+import hashlib
 import json
+import math
 import os
 import re
+import time
+from collections import Counter
+from functools import lru_cache
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
 CONCEPTS_FILE = os.path.join(PROJECT_DIR, "data", "lexicon-concepts.json")
 WORD_STUDIES_FILE = os.path.join(PROJECT_DIR, "data", "kjvstudy", "word_studies.json")
+# Word-study hashes and the field values generated from them at the last sync
+MANIFEST_FILE = os.path.join(PROJECT_DIR, "data", "lexicon-concepts.manifest.json")
+# Part of the generator hash, with this script's source, CATEGORY_MAP and the
+# --score mode; any change to it re-checks every concept
+GENERATOR_VERSION = 2
+STRONGS_FILES = [
+    os.path.join(PROJECT_DIR, "data", "kjvstudy", "strongs", "hebrew.json"),
+    os.path.join(PROJECT_DIR, "data", "kjvstudy", "strongs", "greek.json"),
+]
 
 # Category mappings
 CATEGORY_MAP = {
@@ -53,12 +83,309 @@ CATEGORY_MAP = {
 }
 
 
+# Irregular forms the suffix stripper cannot map onto their root term
+IRREGULAR_STEMS = {
+    "redemption": "redeem",
+    "redemptive": "redeem",
+    "reconciliation": "reconcile",
+    "obedience": "obey",
+    "obedient": "obey",
+    "saviour": "save",
+    "savior": "save",
+    "died": "death",
+    "dead": "death",
+    "holiness": "holy",
+    "prayed": "prayer",
+}
+
+# Longest first; "ification" must win over "ation" and "ion"
+SUFFIXES = sorted([
+    "ification", "ifying", "ified", "ifies", "ify", "ication", "ation", "ition",
+    "ion", "ment", "ness", "ance", "ence", "hood", "ings", "ing", "ers", "er",
+    "ied", "ies", "ed", "es", "ous", "ful", "ive", "ual", "ial", "al", "ity",
+    "ly", "s",
+], key=len, reverse=True)
+
+MIN_STEM = 3
+WORD_RE = re.compile(r"[a-z]+")
+
+# Weighted score a category needs when only one match supports it. A lone
+# weight-1 match (strongs_def, a word-study note) never reaches it: its inverse
+# document frequency is at most log(1 + 14,000) < 10. A lone kjv_def match
+# does, unless its term turns up in more than about 1 in 30 documents
+MIN_SCORE = 10.0
+
+# Parenthesised or bracketed asides, innermost first: "(in the King James Version)", "[idiom]"
+ASIDE_RE = re.compile(r"\([^()]*\)|\[[^\[\]]*\]")
+
+# Strong's definitions of people, peoples and places: "Azarel, the name of
+# five Israelites", "Derbe, a place in Asia Minor", "a Galatian or inhabitant of Galatia"
+PROPER_NAME_RE = re.compile(
+    r"^[A-Z][\w'-]*(?:[ -][A-Z][\w'-]*)*\s*[,;]"
+    r"|\bthe name of\b"
+    r"|, an? (?:Israelite|Levite|Edomite|Canaanite|Philistine|Egyptian|Moabite|Ammonite|Amorite|Hittite"
+    r"|Midianite|Persian|Syrian|Babylonian)s?\b"
+    r"|\b(?:place|city|town|region|district|mountain|river|valley)s? (?:in|near|east|west|north|south)\b"
+    r"|\bor (?:a )?(?:descendants?|descendent|inhabitants?|citizens?|natives?) of\b"
+)
+# Names of God and of Christ, which are kept: "Jah, the sacred name", "Shiloh, an epithet of the Messiah"
+DIVINE_NAME_RE = re.compile(r"\bsacred name\b|\bname of (?:God|our Lord)\b|\bepithet of the Messiah\b")
+
+
+@lru_cache(maxsize=None)
+def stem(word):
+    """Reduce a lowercase word to a crude root so inflections share one index key.
+
+    Not a real stemmer: it only has to map the words in CATEGORY_MAP and their
+    common derived forms (sanctify/sanctification/sanctified) onto the same key.
+    """
+    word = IRREGULAR_STEMS.get(word, word)
+    for _ in range(3):
+        for suffix in SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+                if suffix == "s" and word.endswith("ss"):
+                    continue
+                word = word[:-len(suffix)]
+                break
+        else:
+            break
+    if len(word) > MIN_STEM and word[-1] in "eiy":
+        word = word[:-1]
+    if len(word) > MIN_STEM and word[-1] == word[-2] and word[-1] not in "aeiou":
+        word = word[:-1]
+    return word
+
+
+def _is_consonant(word, i):
+    if word[i] in "aeiou":
+        return False
+    if word[i] == "y":
+        return i == 0 or not _is_consonant(word, i - 1)
+    return True
+
+
+def _measure(word):
+    """Porter's m: the number of vowel-consonant sequences in ``word``."""
+    m = 0
+    previous_vowel = False
+    for i in range(len(word)):
+        consonant = _is_consonant(word, i)
+        if consonant and previous_vowel:
+            m += 1
+        previous_vowel = not consonant
+    return m
+
+
+def _has_vowel(word):
+    return any(not _is_consonant(word, i) for i in range(len(word)))
+
+
+def _ends_cvc(word):
+    n = len(word)
+    return (n >= 3 and _is_consonant(word, n - 3) and not _is_consonant(word, n - 2)
+            and _is_consonant(word, n - 1) and word[-1] not in "wxy")
+
+
+def inflection_stem(word):
+    """Porter steps 1 and 5a: drop only inflections (plurals, -ed/-ing, final -y/-e).
+
+    The same rules as ``stem`` in data/kjvstudy/search_index.py, copied so this
+    script does not import the data package.
+    """
+    if len(word) <= 2:
+        return word
+    # Step 1a
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    # Step 1b
+    if word.endswith("eed"):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ("ed", "ing"):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(("at", "bl", "iz")):
+                    word += "e"
+                elif len(word) >= 2 and word[-1] == word[-2] and _is_consonant(word, len(word) - 1) \
+                        and word[-1] not in "lsz":
+                    word = word[:-1]
+                elif _measure(word) == 1 and _ends_cvc(word):
+                    word += "e"
+                break
+    # Step 1c
+    if word.endswith("y") and _has_vowel(word[:-1]):
+        word = word[:-1] + "i"
+    # Step 5a
+    if word.endswith("e"):
+        m = _measure(word[:-1])
+        if m > 1 or (m == 1 and not _ends_cvc(word[:-1])):
+            word = word[:-1]
+    return word
+
+
+@lru_cache(maxsize=None)
+def index_key(word):
+    """The key a word is indexed under: its root, or for short roots the word itself.
+
+    Roots of MIN_STEM letters or fewer are too ambiguous to share ("wits" and
+    "witness" both reduce to "wit"), so those words only drop their
+    inflections.
+    """
+    root = stem(word)
+    return root if len(root) > MIN_STEM else inflection_stem(IRREGULAR_STEMS.get(word, word))
+
+
+def stems(text):
+    return tuple(index_key(word) for word in WORD_RE.findall(text.lower()))
+
+
+class CategoryIndex:
+    """Inverted index from CATEGORY_MAP terms (exact and stemmed) to categories.
+
+    Built once; every lookup is a dict probe per word (or word pair, for
+    phrases like "born again"), instead of a scan of every category list.
+    Where two categories claim the same stem, the first in CATEGORY_MAP wins,
+    but exact terms always take precedence ("blessed" vs "blessing").
+    """
+
+    def __init__(self, category_map):
+        self.categories = list(category_map)
+        self.exact = {}
+        self.stemmed = {}
+        for category, terms in category_map.items():
+            for term in terms:
+                self.exact.setdefault(term, category)
+                self.stemmed.setdefault(stems(term), category)
+        self.max_phrase = max(len(key) for key in self.stemmed)
+
+    def lookup(self, slug):
+        """Category for a concept slug, or None if no term matches it."""
+        category = self.exact.get(slug) or self.stemmed.get(stems(slug))
+        if category:
+            return category
+        votes = self.match(stems(slug))
+        return self.best(votes) if votes else None
+
+    def match(self, words, weight=1.0, votes=None):
+        """Add ``weight`` to a category for each indexed term or phrase in ``words``."""
+        votes = Counter() if votes is None else votes
+        for size in range(1, self.max_phrase + 1):
+            for i in range(len(words) - size + 1):
+                category = self.stemmed.get(words[i:i + size])
+                if category:
+                    votes[words[i:i + size], category] += weight
+        return votes
+
+    def best(self, votes):
+        """Highest-scoring category; ties go to the earlier CATEGORY_MAP entry."""
+        totals = Counter()
+        for (_, category), score in votes.items():
+            totals[category] += score
+        return min(totals, key=lambda category: (-totals[category], self.categories.index(category)))
+
+    def score(self, documents, min_score=MIN_SCORE, min_matches=2):
+        """Categorize many documents in one pass.
+
+        ``documents`` maps an id to a list of (text, weight) fields. Each
+        matched term counts ``weight`` times its inverse document frequency
+        over the batch, so terms that turn up everywhere ("god", "life") count
+        for less than distinctive ones. Returns {id: category} for documents
+        whose best category has at least ``min_matches`` matches or scores at
+        least ``min_score``; a lone, common term is not enough.
+        """
+        matches = {}
+        doc_freq = Counter()
+        for doc_id, fields in documents.items():
+            votes = Counter()
+            hits = Counter()
+            for text, weight in fields:
+                if text:
+                    for key, count in self.match(stems(strip_html(text))).items():
+                        votes[key] += count * weight
+                        hits[key[1]] += count
+            matches[doc_id] = votes, hits
+            doc_freq.update({term for term, _ in votes})
+
+        total = len(documents)
+        idf = {term: math.log(1 + total / count) for term, count in doc_freq.items()}
+        categories = {}
+        for doc_id, (votes, hits) in matches.items():
+            if not votes:
+                continue
+            weighted = Counter({key: score * idf[key[0]] for key, score in votes.items()})
+            category = self.best(weighted)
+            if hits[category] >= min_matches or \
+                    sum(score for (_, c), score in weighted.items() if c == category) >= min_score:
+                categories[doc_id] = category
+        return categories
+
+
+CATEGORY_INDEX = CategoryIndex(CATEGORY_MAP)
+
+
 def get_category(slug):
     """Determine category for a word study slug."""
-    for category, words in CATEGORY_MAP.items():
-        if slug in words:
-            return category
-    return "General"
+    return CATEGORY_INDEX.lookup(slug) or "General"
+
+
+def word_study_fields(ws):
+    """Weighted text fields of a word study for the scoring pass."""
+    return [
+        (ws.get("ot_meaning", ""), 3.0),
+        (ws.get("nt_meaning", ""), 3.0),
+        (ws.get("ot_note", ""), 1.0),
+        (ws.get("nt_note", ""), 1.0),
+    ]
+
+
+def strip_asides(text):
+    """Remove parenthesised and bracketed asides, including nested ones."""
+    while True:
+        stripped = ASIDE_RE.sub("", text)
+        if stripped == text:
+            return text
+        text = stripped
+
+
+def is_proper_name(entry):
+    """True if a Strong's lexicon entry names a person, people or place (other than God or Christ)."""
+    definition = strip_asides(entry.get("strongs_def", "")).strip()
+    return bool(PROPER_NAME_RE.search(definition)) and not DIVINE_NAME_RE.search(definition)
+
+
+def lexicon_fields(entry):
+    """Weighted text fields of a Strong's lexicon entry for the scoring pass.
+
+    kjv_def lists the English words the KJV uses for the entry, which is the
+    closest match to CATEGORY_MAP terms; strongs_def is a looser gloss.
+    Editorial asides such as "(in the King James Version)" are dropped.
+    """
+    return [
+        (strip_asides(entry.get("kjv_def", "")), 3.0),
+        (strip_asides(entry.get("strongs_def", "")), 1.0),
+    ]
+
+
+def categorize_lexicons(paths):
+    """Return ({Strong's number: category} for every lexicon entry that scores, entries read).
+
+    Proper names are left out of the batch entirely, so they neither get a
+    category nor dilute the term frequencies.
+    """
+    documents = {}
+    total = 0
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for number, entry in json.load(f).items():
+                total += 1
+                if not is_proper_name(entry):
+                    documents[number] = lexicon_fields(entry)
+    return CATEGORY_INDEX.score(documents), total
 
 
 def capitalize_name(slug):
@@ -124,65 +451,184 @@ def generate_description(slug, ws):
     return desc
 
 
+def generate_concept(slug, ws, scored):
+    """Generated fields for a word study, or None if it has no Strong's numbers."""
+    all_strongs = ws.get("ot_strongs", []) + ws.get("nt_strongs", [])
+    if not all_strongs:
+        return None
+    return {
+        "name": capitalize_name(slug),
+        "title": generate_title(slug, ws),
+        "description": generate_description(slug, ws),
+        "strongs": all_strongs,
+        "category": CATEGORY_INDEX.lookup(slug) or scored.get(slug, "General"),
+    }
+
+
+def word_study_hash(ws):
+    return hashlib.sha256(json.dumps(ws, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def merge_concept(concept, generated, recorded):
+    """Update a concept in place with regenerated fields, keeping hand edits.
+
+    A field counts as hand-edited when its current value differs from what the
+    last sync generated for it. Without a manifest record (concepts written by
+    hand or before manifests existed) every field that differs from the new
+    value is treated as hand-edited. Returns the names of the fields kept.
+    """
+    previous = recorded["generated"] if recorded else {}
+    kept = []
+    for field, value in generated.items():
+        current = concept.get(field)
+        if current == value:
+            continue
+        if field in concept and (field not in previous or current != previous[field]):
+            kept.append(field)
+            continue
+        concept[field] = value
+    return kept
+
+
+def generator_hash(score):
+    """Hash of everything besides the word study that shapes a generated concept."""
+    digest = hashlib.sha256(f"v{GENERATOR_VERSION} score={bool(score)}".encode("utf-8"))
+    digest.update(json.dumps(CATEGORY_MAP, sort_keys=True).encode("utf-8"))
+    with open(os.path.abspath(__file__), "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_manifest(path):
+    """Load the sync manifest, or an empty one.
+
+    Records from another generator are kept: their generated values are still
+    what hand edits are detected against, and main() re-checks every concept
+    when the generator hash differs.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault("concepts", {})
+    manifest.pop("generator_version", None)
+    return manifest
+
+
+def write_json_if_changed(path, data, **dump_args):
+    """Atomically replace path with data as JSON unless it already holds exactly that. Returns True if written."""
+    text = json.dumps(data, ensure_ascii=False, **dump_args)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_strongs_categories(out_path, dry_run=False):
+    """Categorize the Strong's lexicons and write {number: category} to out_path (only report if dry_run)."""
+    started = time.perf_counter()
+    categories, total = categorize_lexicons(STRONGS_FILES)
+    elapsed = time.perf_counter() - started
+    if not dry_run:
+        write_json_if_changed(out_path, categories, indent=2, sort_keys=True)
+    counts = Counter(categories.values())
+    target = "not written (dry run)" if dry_run else f"-> {out_path}"
+    print(f"Categorized {len(categories)} of {total} Strong's entries in {elapsed:.2f}s {target}")
+    for category, count in counts.most_common():
+        print(f"  - {category}: {count}")
+
+
 def main():
-    # 1. Read existing concepts
-    with open(CONCEPTS_FILE, "r", encoding="utf-8") as f:
-        existing_concepts = json.load(f)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--score", action="store_true",
+                        help="Categorize concepts whose slug matches no term by scoring "
+                             "their word-study meanings and notes")
+    parser.add_argument("--strongs", metavar="OUT",
+                        help="Also categorize every entry of the Strong's Hebrew and Greek "
+                             "lexicons and write {number: category} to OUT")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report what would be added and updated without writing anything")
+    args = parser.parse_args()
 
-    original_count = len(existing_concepts)
-    existing_slugs = {c["slug"] for c in existing_concepts}
+    if args.strongs:
+        write_strongs_categories(args.strongs, args.dry_run)
+
+    # 1. Read existing concepts and the manifest from the last sync
+    with open(CONCEPTS_FILE, "r", encoding="utf-8") as f:
+        concepts = json.load(f)
+    manifest = load_manifest(MANIFEST_FILE)
+    generator = generator_hash(args.score)
+    # A changed generator can change every concept, whatever its word study
+    regenerate = manifest.get("generator") != generator
+    manifest["generator"] = generator
 
     # 2. Read word studies
     with open(WORD_STUDIES_FILE, "r", encoding="utf-8") as f:
         word_studies = json.load(f)
 
-    # 3. Generate new entries
+    # Batch-score the meanings and notes of every word study up front, so the
+    # inverse document frequencies are computed over the whole collection
+    scored = CATEGORY_INDEX.score({slug: word_study_fields(ws) for slug, ws in word_studies.items()}) if args.score else {}
+
+    # 3. Diff word studies against concepts by slug and content hash
+    by_slug = {c["slug"]: c for c in concepts}
     new_concepts = []
-    skipped_no_strongs = []
-    skipped_existing = []
+    added, updated, unchanged, skipped_no_strongs = [], [], [], []
+    preserved = {}
 
     for slug, ws in word_studies.items():
-        # Skip if already in concepts
-        if slug in existing_slugs:
-            skipped_existing.append(slug)
+        source_hash = word_study_hash(ws)
+        recorded = manifest["concepts"].get(slug)
+        concept = by_slug.get(slug)
+        if concept is not None and recorded and recorded["hash"] == source_hash and not regenerate:
+            unchanged.append(slug)
             continue
 
-        # Gather Strong's numbers
-        ot_strongs = ws.get("ot_strongs", [])
-        nt_strongs = ws.get("nt_strongs", [])
-        all_strongs = ot_strongs + nt_strongs
-
+        generated = generate_concept(slug, ws, scored)
         # Skip if no Strong's numbers at all
-        if not all_strongs:
+        if generated is None:
             skipped_no_strongs.append(slug)
             continue
 
-        concept = {
-            "slug": slug,
-            "name": capitalize_name(slug),
-            "title": generate_title(slug, ws),
-            "description": generate_description(slug, ws),
-            "strongs": all_strongs,
-            "category": get_category(slug),
-        }
-        new_concepts.append(concept)
-
-    # 4. Sort new concepts alphabetically by slug
-    new_concepts.sort(key=lambda c: c["slug"])
+        if concept is None:
+            concept = {"slug": slug, **generated}
+            new_concepts.append(concept)
+            added.append(slug)
+        else:
+            before = dict(concept)
+            kept = merge_concept(concept, generated, recorded)
+            if kept:
+                preserved[slug] = kept
+            (updated if concept != before else unchanged).append(slug)
+        manifest["concepts"][slug] = {"hash": source_hash, "generated": generated}
 
-    # 5. Combine: originals first, then new ones
-    combined = existing_concepts + new_concepts
+    # 4. Existing concepts keep their place; new ones follow, sorted by slug
+    new_concepts.sort(key=lambda c: c["slug"])
+    combined = [by_slug[c["slug"]] for c in concepts] + new_concepts
 
-    # 6. Write back
-    with open(CONCEPTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(combined, f, indent=4, ensure_ascii=False)
+    # 5. Write back (atomically, and only if something changed)
+    if args.dry_run:
+        print("Dry run: nothing written")
+    else:
+        if write_json_if_changed(CONCEPTS_FILE, combined, indent=4):
+            print(f"Wrote {len(combined)} concepts to {CONCEPTS_FILE}")
+        write_json_if_changed(MANIFEST_FILE, manifest, indent=2, sort_keys=True)
 
-    # 7. Print summary
-    print(f"Expanded from {original_count} to {len(combined)} concepts")
-    print(f"  - Kept {original_count} original concepts unchanged")
-    print(f"  - Added {len(new_concepts)} new concepts from word studies")
-    if skipped_existing:
-        print(f"  - Skipped {len(skipped_existing)} (already exist): {', '.join(sorted(skipped_existing))}")
+    # 6. Print summary
+    print(f"Synced {len(word_studies)} word studies into {len(combined)} concepts")
+    print(f"  - Added {len(added)}: {', '.join(sorted(added))}" if added else "  - Added 0")
+    print(f"  - Updated {len(updated)}: {', '.join(sorted(updated))}" if updated else "  - Updated 0")
+    print(f"  - Unchanged {len(unchanged)}")
+    for slug, fields in sorted(preserved.items()):
+        print(f"  - Kept hand edits to {slug}: {', '.join(fields)}")
     if skipped_no_strongs:
         print(f"  - Skipped {len(skipped_no_strongs)} (no Strong's numbers): {', '.join(sorted(skipped_no_strongs))}")
 
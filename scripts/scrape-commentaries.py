@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Scrape public-domain commentaries from BibleHub into data/commentaries/<name>.json.
+
+Each commentary is a parser plugin registered in scripts/_scraper_plugins.py;
+scripts/_scraper.py plans the (commentary, book, chapter) jobs and runs them
+through one fetch/parse pipeline, so several commentaries scraped together
+share connections and the adaptive rate budget.
+
+Usage:
+  python scripts/scrape-commentaries.py                 # every registered commentary
+  python scripts/scrape-commentaries.py ellicott        # just one
+  python scripts/scrape-commentaries.py --resume        # continue an interrupted run
+  python scripts/scrape-commentaries.py --offline       # re-parse cached pages only
+"""
+
+from _scraper import run
+
+if __name__ == '__main__':
+    run(description=__doc__)
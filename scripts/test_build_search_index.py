@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/build-search-index.py.
+
+Usage:
+  python scripts/test_build_search_index.py
+  python -m pytest scripts/test_build_search_index.py
+"""
+
+import importlib.util, json, os, sys, tempfile, unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+from data.kjvstudy.references import parse
+from data.kjvstudy.search_index import SearchIndex, write_index
+
+spec = importlib.util.spec_from_file_location('build_search_index', os.path.join(SCRIPT_DIR, 'build-search-index.py'))
+build_search_index = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(build_search_index)
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+class BuildSearchIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.dirs = {
+            'VERSE_COMMENTARY_DIR': os.path.join(root, 'verse_commentary'),
+            'COMMENTARIES_DIR': os.path.join(root, 'commentaries'),
+            'RESOURCES_DIR': os.path.join(root, 'resources'),
+        }
+        self.saved = {name: getattr(build_search_index, name) for name in self.dirs}
+        for name, path in self.dirs.items():
+            setattr(build_search_index, name, path)
+        write_json(os.path.join(self.dirs['VERSE_COMMENTARY_DIR'], 'john.json'),
+                   {'book': 'John', 'commentary': {'3': {'16': {'analysis': 'God so loved the world'}}}})
+        write_json(os.path.join(self.dirs['RESOURCES_DIR'], 'angels.json'),
+                   {'Angels': {'Cherubim': 'Guardians of the garden'}})
+        write_json(os.path.join(self.dirs['COMMENTARIES_DIR'], 'mhc.json'),
+                   {'romans-3-25': 'Christ set forth to be a propitiation'})
+
+    def tearDown(self):
+        for name, path in self.saved.items():
+            setattr(build_search_index, name, path)
+        self.tmp.cleanup()
+
+    def build(self):
+        path = os.path.join(self.tmp.name, 'search.index')
+        units = build_search_index.list_units()
+        write_index(path, map(build_search_index.index_unit, units))
+        return units, SearchIndex(path)
+
+    def test_builds_with_convert_manifest_present(self):
+        # What scripts/convert-sword-commentaries.py leaves next to its outputs
+        write_json(os.path.join(self.dirs['COMMENTARIES_DIR'], '.convert-manifest.json'),
+                   {'converter_version': 2, 'converter_hash': '0' * 64, 'modules': {}})
+        units, index = self.build()
+        self.assertEqual([source for kind, source, _ in units if kind == 'commentary'], ['mhc'])
+        hits = index.search('propitiation')
+        self.assertEqual([(hit.source, hit.key, hit.verse_id) for hit in hits],
+                         [('mhc', 'romans-3-25', parse('Romans 3:25'))])
+        self.assertEqual(index.search('cherubim')[0].source, 'resources')
+        index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
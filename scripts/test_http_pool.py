@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the AIMD controller in scripts/_http_pool.py.
+
+Usage:
+  python scripts/test_http_pool.py
+  python -m pytest scripts/test_http_pool.py
+"""
+
+import asyncio, os, random, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _http_pool import AdaptiveLimiter, ConnectionPool
+
+
+async def serve_steady(latency, body=b'ok' * 512):
+    """A keep-alive HTTP server that answers every request after a flat ``latency``."""
+    async def handle(reader, writer):
+        try:
+            while True:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                if reader.at_eof():
+                    break
+                await asyncio.sleep(latency)
+                writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n' % len(body) + body)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+class AdaptiveLimiterTest(unittest.TestCase):
+
+    def test_jitter_does_not_shrink_limit(self):
+        limiter = AdaptiveLimiter(10, maximum=64)
+        rng = random.Random(1)
+        for _ in range(20000):
+            # 44 ms with the occasional slow response
+            latency = 0.044 * rng.lognormvariate(0, 0.3) * (4 if rng.random() < 0.01 else 1)
+            limiter.observe(latency, 200)
+        self.assertEqual(limiter.limit, 64)
+
+    def test_latency_rising_with_concurrency_backs_off(self):
+        limiter = AdaptiveLimiter(4, maximum=64)
+        for _ in range(5000):
+            # Past 8 requests in flight the server queues, and latency climbs steeply
+            limiter.observe(0.01 * max(1.0, limiter.limit / 8) ** 2, 200)
+        self.assertGreater(limiter.decreases, 0)
+        self.assertLess(limiter.peak, 32)
+
+    def test_recovers_from_the_floor(self):
+        limiter = AdaptiveLimiter(16, maximum=64)
+        for _ in range(500):
+            limiter.observe(0.001, 429)
+        self.assertEqual(limiter.limit, 1)
+        for _ in range(3000):
+            limiter.observe(0.04, 200)
+        self.assertGreater(limiter.limit, 16)
+
+    def test_slow_spell_does_not_pin_the_limit(self):
+        limiter = AdaptiveLimiter(16, maximum=64)
+        # Normal, then a spell five times slower than the baseline, then normal again
+        for latency in [0.04] * 200 + [0.2] * 2000:
+            limiter.observe(latency, 200)
+        self.assertGreater(limiter.limit, limiter.minimum)
+        for _ in range(3000):
+            limiter.observe(0.04, 200)
+        self.assertGreater(limiter.limit, 16)
+
+    def test_steady_server_does_not_shrink_limit(self):
+        async def run():
+            server = await serve_steady(0.044)
+            port = server.sockets[0].getsockname()[1]
+            limiter = AdaptiveLimiter(10, maximum=32)
+            async with ConnectionPool(limiter=limiter) as pool:
+                async def worker():
+                    for _ in range(40):
+                        await pool.get(f'http://127.0.0.1:{port}/page')
+                await asyncio.gather(*[worker() for _ in range(32)])
+            # Let the handlers see the closed connections before the loop stops
+            await asyncio.sleep(0.05)
+            server.close()
+            await server.wait_closed()
+            return limiter
+
+        limiter = asyncio.run(run())
+        self.assertEqual(limiter.decreases, 0)
+        self.assertGreaterEqual(limiter.limit, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()